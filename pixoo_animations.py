@@ -0,0 +1,282 @@
+"""
+DIVOOM PIXOO 64x64 animation plugins
+Stateful animation classes that produce frames lazily, plus the registry that names them
+"""
+
+import math
+
+import numpy as np
+
+from pixoo_canvas import HEIGHT, WIDTH, Canvas
+
+# Coordinate grids shared by every animation (Y = row, X = column)
+Y, X = np.mgrid[0:HEIGHT, 0:WIDTH]
+COLUMNS = np.arange(WIDTH)
+ROWS = np.arange(HEIGHT)
+
+ANIMATIONS = {}
+
+
+def register(cls=None, name=None):
+    """
+    Registers an Animation subclass under its name (usable as a decorator)
+
+        @register
+        class Fire(Animation):
+            name = "fire"
+            def draw(self, frame, frame_num): ...
+
+    Registered names work everywhere an animation type is accepted
+    (send_animation, loop_animation, render_animation_frame, ...).
+    """
+    def decorate(cls):
+        key = name or cls.name
+        if not key:
+            raise ValueError(f"{cls.__name__} has no animation name")
+        ANIMATIONS[key] = cls
+        return cls
+    return decorate if cls is None else decorate(cls)
+
+
+def get_animation(animation_type, total_frames=30):
+    """New instance of a registered animation (None if the name is unknown)"""
+    cls = ANIMATIONS.get(animation_type)
+    return None if cls is None else cls(total_frames)
+
+
+def animation_class(animation_type):
+    """Registered class for a name (ValueError if the name is unknown)"""
+    cls = ANIMATIONS.get(animation_type)
+    if cls is None:
+        raise ValueError(f"unknown animation {animation_type!r} (choose from {', '.join(ANIMATIONS)})")
+    return cls
+
+
+def cache_params(animation_type, total_frames):
+    """
+    JSON-serializable identity of an animation's frames, for FrameCache keys
+
+    Includes the plugin class and its version attribute, so frames cached
+    on disk are not served after the plugin changes or a different class
+    is registered under the same name.
+    """
+    cls = animation_class(animation_type)
+    return {
+        "animation_type": animation_type,
+        "total_frames": total_frames,
+        "plugin": f"{cls.__module__}.{cls.__qualname__}",
+        "version": cls.version,
+    }
+
+
+class Animation:
+    """
+    Base class for animation plugins
+
+    Subclasses implement draw(), which renders any frame from scratch onto
+    a black 64x64x3 uint8 array without touching the instance, so one
+    instance can serve random-access renders from several threads.
+    Iterating an instance yields its frames in order as Canvas objects,
+    carrying the previous frame along; override update() to derive each
+    frame from it instead of redrawing. Lookup tables shared by every
+    instance go in build_tables(), computed once per class; tables that
+    depend on total_frames go in setup().
+    """
+
+    name = None
+    version = None      # Bump when draw() changes, to invalidate cached frames
+    _tables = None
+
+    def __init__(self, total_frames=30):
+        self.total_frames = total_frames
+        cls = type(self)
+        if cls.__dict__.get("_tables") is None:
+            cls._tables = cls.build_tables()
+        self.tables = cls._tables
+        self.setup()
+
+    @classmethod
+    def build_tables(cls):
+        """Per-class precomputed data (called once, on first instantiation)"""
+        return {}
+
+    def setup(self):
+        """Per-instance precomputed tables"""
+
+    def draw(self, frame, frame_num):
+        """Renders frame_num onto a black frame"""
+        raise NotImplementedError
+
+    def update(self, frame, frame_num, previous):
+        """Turns frame number previous (still in the buffer) into frame_num"""
+        frame.fill(0)
+        self.draw(frame, frame_num)
+
+    def render(self, frame_num, canvas=None):
+        """Renders one frame from scratch (random access)"""
+        canvas = Canvas() if canvas is None else canvas.clear()
+        self.draw(canvas.array, frame_num % self.total_frames)
+        return canvas
+
+    def frames(self, loop=False):
+        """
+        Yields the frames in order, each derived from the previous one
+
+        Every yielded Canvas is independent, so frames may be buffered.
+        With loop=True the animation repeats forever (for streaming).
+        """
+        canvas = Canvas()
+        self.draw(canvas.array, 0)
+        frame_num = 0
+        while True:
+            yield canvas.copy()
+            previous, frame_num = frame_num, frame_num + 1
+            if frame_num == self.total_frames:
+                if not loop:
+                    return
+                frame_num = 0
+            self.update(canvas.array, frame_num, previous)
+
+    def __iter__(self):
+        return self.frames()
+
+    def __len__(self):
+        return self.total_frames
+
+
+# ---------------------------------------------------------------------------
+# Built-in animations
+# ---------------------------------------------------------------------------
+
+@register
+class Spinner(Animation):
+    name = "spinner"
+
+    @classmethod
+    def build_tables(cls):
+        center_dist = np.sqrt((X - 32) ** 2 + (Y - 32) ** 2)
+        return {"ring": (center_dist >= 18) & (center_dist <= 22)}
+
+    def setup(self):
+        # Posição do ponto em cada frame, calculada uma vez
+        self.points = []
+        for frame_num in range(self.total_frames):
+            angle = (frame_num / self.total_frames) * 2 * math.pi
+            self.points.append((32 + int(20 * math.cos(angle)), 32 + int(20 * math.sin(angle))))
+
+    def _dot(self, frame_num):
+        point_x, point_y = self.points[frame_num]
+        return slice(max(0, point_y - 2), point_y + 3), slice(max(0, point_x - 2), point_x + 3)
+
+    def draw(self, frame, frame_num):
+        # Anel base azul
+        frame[self.tables["ring"], 2] = 100
+        frame[self._dot(frame_num)] = (255, 100, 0)
+
+    def update(self, frame, frame_num, previous):
+        # Apaga só o ponto anterior, restaurando o anel por baixo dele
+        rows, cols = self._dot(previous)
+        frame[rows, cols] = 0
+        frame[rows, cols, 2][self.tables["ring"][rows, cols]] = 100
+        frame[self._dot(frame_num)] = (255, 100, 0)
+
+
+@register
+class Wave(Animation):
+    name = "wave"
+
+    @classmethod
+    def build_tables(cls):
+        # A onda tem 3 pixels por coluna: o centro e um acima/abaixo (verde mais fraco)
+        offsets = np.array([-1, 0, 1])
+        return {"offsets": offsets[:, np.newaxis], "green": (255 - np.abs(offsets) * 100)[:, np.newaxis]}
+
+    def setup(self):
+        # Linhas da onda em cada coluna, para todos os frames
+        self.rows = []
+        for frame_num in range(self.total_frames):
+            wave_offset = (frame_num / self.total_frames) * 4 * math.pi
+            wave_y = 32 + np.trunc(15 * np.sin((COLUMNS / 64.0) * 2 * math.pi + wave_offset)).astype(int)
+            self.rows.append(wave_y[np.newaxis, :] + self.tables["offsets"])
+
+    def draw(self, frame, frame_num):
+        rows = self.rows[frame_num]
+        frame[rows, COLUMNS, 1] = self.tables["green"]
+        frame[rows, COLUMNS, 2] = 255
+
+    def update(self, frame, frame_num, previous):
+        # Só os pixels da onda anterior são apagados
+        frame[self.rows[previous], COLUMNS] = 0
+        self.draw(frame, frame_num)
+
+
+@register
+class Plasma(Animation):
+    name = "plasma"
+
+    @classmethod
+    def build_tables(cls):
+        # Cada onda depende de um único eixo: argumentos 1D e índice da diagonal
+        return {
+            "columns": COLUMNS / 16.0,
+            "rows": ROWS / 8.0,
+            "diagonal": np.arange(WIDTH + HEIGHT - 1) / 16.0,
+            "diagonal_index": X + Y,
+        }
+
+    def draw(self, frame, frame_num):
+        tables = self.tables
+        time_offset = (frame_num / self.total_frames) * 2 * math.pi
+
+        value1 = np.sin(tables["columns"] + time_offset)
+        value2 = np.sin(tables["rows"] + time_offset * 1.5)
+        value3 = np.sin(tables["diagonal"] + time_offset * 2)
+
+        plasma = (value1[np.newaxis, :] + value2[:, np.newaxis] + value3[tables["diagonal_index"]]) / 3.0
+        phase = plasma * math.pi
+
+        frame[..., 0] = 127 + 127 * np.sin(phase)
+        frame[..., 1] = 127 + 127 * np.sin(phase + 2)
+        frame[..., 2] = 127 + 127 * np.sin(phase + 4)
+
+    def update(self, frame, frame_num, previous):
+        # Todos os pixels mudam; nada a limpar antes
+        self.draw(frame, frame_num)
+
+
+@register
+class BouncingBall(Animation):
+    name = "bouncing_ball"
+    radius = 4
+
+    def setup(self):
+        # Trajetória inteira calculada uma vez
+        self.positions = []
+        for frame_num in range(self.total_frames):
+            progress = frame_num / self.total_frames
+            self.positions.append((int(32 + 20 * math.sin(progress * 2 * math.pi)),
+                                   int(32 + abs(20 * math.sin(progress * 4 * math.pi)))))
+
+    def _box(self, frame_num):
+        ball_x, ball_y = self.positions[frame_num]
+        r = self.radius
+        return (slice(max(0, ball_y - r), min(HEIGHT, ball_y + r + 1)),
+                slice(max(0, ball_x - r), min(WIDTH, ball_x + r + 1)))
+
+    def draw(self, frame, frame_num):
+        ball_x, ball_y = self.positions[frame_num]
+        r = self.radius
+        # Só a caixa em volta da bola precisa ser calculada
+        rows, cols = self._box(frame_num)
+
+        dist = np.sqrt((X[rows, cols] - ball_x) ** 2 + (Y[rows, cols] - ball_y) ** 2)
+        mask = dist <= r
+        intensity = np.maximum(0, 255 * (1 - dist[mask] / r))
+        region = frame[rows, cols]
+        region[mask, 0] = intensity
+        region[mask, 1] = intensity
+
+    def update(self, frame, frame_num, previous):
+        # Apaga a bola anterior e desenha a nova
+        frame[self._box(previous)] = 0
+        self.draw(frame, frame_num)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+DIVOOM PIXOO 64x64 benchmarks
+Measures the controller's hot paths against a local mock device
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import time
+
+from pixoo_canvas import Canvas
+from pixoo_color import PROFILES
+from pixoo_controller import PixooController
+from pixoo_mock import MockPixooServer
+from pixoo_render import ANIMATIONS, PATTERNS, render_animation_frame, render_pattern
+
+
+def measure(func, repeat):
+    """Runs func `repeat` times; returns timing statistics in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+        "runs": len(samples),
+    }
+
+
+def bench_render(repeat):
+    """Frame render time per animation type and pattern"""
+    results = {}
+    for animation_type in ANIMATIONS:
+        counter = iter(range(10 ** 9))
+        canvas = Canvas()
+        results[f"animation:{animation_type}"] = measure(
+            lambda: render_animation_frame(animation_type, next(counter) % 30, 30, canvas), repeat)
+    for pattern in PATTERNS:
+        canvas = Canvas()
+        results[f"pattern:{pattern}"] = measure(lambda: render_pattern(pattern, canvas), repeat)
+    return results
+
+
+def bench_encode(repeat):
+    """base64 PicData encoding cost for one frame, and the output color stage on top of it"""
+    canvas = render_animation_frame("plasma", 0, 30)
+    results = {"encode:pic_data": measure(canvas.to_pic_data, repeat)}
+    pic_data = canvas.to_pic_data()
+    for name, profile in PROFILES.items():
+        results[f"color:{name}"] = measure(lambda: profile.apply_pic_data(pic_data), repeat)
+    return results
+
+
+def bench_commands(pixoo, repeat):
+    """Round-trip latency per command type"""
+    frame = render_pattern("gradient").to_pic_data()
+    commands = {
+        "Draw/SendHttpText": {"Command": "Draw/SendHttpText", "TextId": 1, "x": 0, "y": 20, "dir": 0,
+                              "font": 8, "TextWidth": 64, "speed": 70, "TextString": "bench",
+                              "color": "#FFFFFF", "align": 2},
+        "Draw/ClearHttpText": {"Command": "Draw/ClearHttpText"},
+        "Draw/ResetHttpGifId": {"Command": "Draw/ResetHttpGifId"},
+        "Channel/SetIndex": {"Command": "Channel/SetIndex", "SelectIndex": 4},
+        "Draw/SendHttpGif": pixoo.create_frame_command(frame),
+    }
+    return {f"rtt:{name}": measure(lambda: pixoo.send_command(command, dedupe=False), repeat)
+            for name, command in commands.items()}
+
+
+def bench_end_to_end(pixoo, repeat):
+    """Wall time of complete user-facing operations"""
+    results = {}
+    for animation_type in ANIMATIONS:
+        results[f"send_animation:{animation_type}"] = measure(
+            lambda: pixoo.send_animation(animation_type, total_frames=30), max(1, repeat // 10))
+
+    # Códigos sempre novos (sem cache) e um código repetido (PicData em cache)
+    tickets = itertools.count()
+    results["send_qr_code"] = measure(
+        lambda: pixoo.send_qr_code(f"https://example.com/ticket/{next(tickets):06d}"), max(1, repeat // 10))
+    results["send_qr_code:cached"] = measure(
+        lambda: pixoo.send_qr_code("https://example.com/ticket/000000"), max(1, repeat // 10))
+    return results
+
+
+def run(repeat=50, latency=0.0, jitter=0.0, end_to_end=True):
+    """Runs the whole suite against a fresh mock device; returns {benchmark: stats}"""
+    results = {}
+    results.update(bench_render(repeat))
+    results.update(bench_encode(repeat))
+
+    with MockPixooServer(latency=latency, jitter=jitter, seed=0) as mock:
+        pixoo = PixooController(mock.host, port=mock.port, verbose=False, dedupe=False)
+        try:
+            results.update(bench_commands(pixoo, repeat))
+            if end_to_end:
+                results.update(bench_end_to_end(pixoo, repeat))
+        finally:
+            pixoo.close()
+    return results
+
+
+def print_results(results):
+    print(f"{'benchmark':40} {'median':>10} {'p95':>10} {'mean':>10} {'runs':>6}")
+    for name, stats in results.items():
+        print(f"{name:40} {stats['median_ms']:9.3f}ms {stats['p95_ms']:9.3f}ms "
+              f"{stats['mean_ms']:9.3f}ms {stats['runs']:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PIXOO controller benchmarks (mock device)")
+    parser.add_argument("--repeat", type=int, default=50, help="runs per micro-benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock device delay per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="mock device random extra delay (s)")
+    parser.add_argument("--quick", action="store_true", help="skip end-to-end benchmarks")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.latency, args.jitter, end_to_end=not args.quick)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
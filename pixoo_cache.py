@@ -0,0 +1,148 @@
+"""
+DIVOOM PIXOO 64x64 frame cache
+Content-addressed PicData cache with LRU eviction and optional disk store
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Bump when the renderers change output, so old disk entries are ignored
+CACHE_VERSION = 1
+
+
+class FrameCache:
+    def __init__(self, max_bytes=8 * 1024 * 1024, disk_dir=None):
+        """
+        Cache of encoded frames (base64 PicData strings)
+
+        Args:
+            max_bytes: memory budget; least recently used frames are evicted first
+            disk_dir: directory for the persistent store (memory only if None)
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(generator, params, frame_index=0):
+        """Builds the content address for a generator, its parameters and a frame index"""
+        material = json.dumps([CACHE_VERSION, generator, params, frame_index],
+                              sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".b64")
+
+    def _store(self, key, pic_data):
+        # Chamado com o lock adquirido
+        if key in self._entries:
+            self.current_bytes -= len(self._entries.pop(key))
+        if len(pic_data) > self.max_bytes:
+            return
+        self._entries[key] = pic_data
+        self.current_bytes += len(pic_data)
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def get(self, key):
+        """Returns the cached PicData for a key, or None"""
+        with self._lock:
+            pic_data = self._entries.get(key)
+            if pic_data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pic_data
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="ascii") as f:
+                    pic_data = f.read()
+            except OSError:
+                pic_data = None
+            if pic_data:
+                with self._lock:
+                    self._store(key, pic_data)
+                    self.disk_hits += 1
+                return pic_data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, pic_data):
+        """Stores PicData in memory and, if enabled, on disk"""
+        with self._lock:
+            self._store(key, pic_data)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                return
+            tmp_path = None
+            try:
+                # Disco é só um complemento: diretório somente leitura ou cheio mantém o cache em memória
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Escrita atômica: outro processo nunca lê um arquivo pela metade
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="ascii") as f:
+                    f.write(pic_data)
+                os.replace(tmp_path, path)
+            except OSError:
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def get_or_render(self, generator, params, frame_index, render):
+        """
+        Returns the cached frame or renders, stores and returns it
+
+        Args:
+            generator: generator name, e.g. "animation" or "pattern"
+            params: JSON-serializable generator parameters
+            frame_index: frame number inside the sequence
+            render: callable returning the PicData string on a miss
+        """
+        key = self.make_key(generator, params, frame_index)
+        pic_data = self.get(key)
+        if pic_data is None:
+            pic_data = render()
+            self.put(key, pic_data)
+        return pic_data
+
+    def clear(self, disk=False):
+        """Empties the memory cache (and the disk store if disk=True)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+        if disk and self.disk_dir:
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if name.endswith(".b64"):
+                        os.remove(os.path.join(root, name))
+
+    def stats(self):
+        """Returns hit/miss counters and memory usage"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,187 @@
+"""
+DIVOOM PIXOO 64x64 framebuffer
+RGB24 canvas over a reusable buffer, with drawing primitives and PicData encoding
+"""
+
+import binascii
+
+import numpy as np
+
+WIDTH = 64
+HEIGHT = 64
+FRAME_SHAPE = (HEIGHT, WIDTH, 3)
+FRAME_BYTES = WIDTH * HEIGHT * 3  # 12288 bytes RGB24
+
+
+def _clip(x, y, w, h):
+    """Clips a rectangle to the screen; returns (x0, y0, x1, y1) or None if off-screen"""
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(WIDTH, x + w), min(HEIGHT, y + h)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+
+class Canvas:
+    """
+    64x64 RGB24 framebuffer
+
+    The pixels live in one writable buffer exposed three ways without
+    copies: `buffer` (bytearray or array), `view` (flat memoryview) and
+    `array` (64x64x3 uint8 NumPy view, indexed [y, x]).
+    """
+
+    __slots__ = ("buffer", "view", "array")
+
+    def __init__(self, buffer=None):
+        if buffer is None:
+            buffer = bytearray(FRAME_BYTES)
+        self.buffer = buffer
+        self.array = np.frombuffer(buffer, dtype=np.uint8).reshape(FRAME_SHAPE)
+        self.view = memoryview(self.array).cast('B')
+        if self.array.flags.writeable is False:
+            raise ValueError("Canvas buffer must be writable")
+
+    # ------------------------------------------------------------------
+    # Construction / import
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        Wraps a 64x64x3 uint8 array
+
+        C-contiguous, writable uint8 arrays are shared without copying;
+        anything else is converted into a new buffer.
+        """
+        array = np.asarray(array)
+        if (array.shape == FRAME_SHAPE and array.dtype == np.uint8
+                and array.flags.c_contiguous and array.flags.writeable):
+            return cls(array)
+        canvas = cls()
+        canvas.array[...] = array
+        return canvas
+
+    @classmethod
+    def from_image(cls, image):
+        """Creates a canvas from a PIL image (converted to 64x64 RGB if needed)"""
+        canvas = cls()
+        canvas.paste_image(image)
+        return canvas
+
+    def paste_image(self, image, x=0, y=0):
+        """Copies a PIL image into the canvas in a single buffer copy"""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        self.blit(np.asarray(image), x, y)
+        return self
+
+    def copy(self):
+        """Returns an independent copy of the canvas"""
+        return Canvas(bytearray(self.view))
+
+    def copy_from(self, other):
+        """Overwrites this canvas with another canvas or array, reusing the buffer"""
+        source = other.array if isinstance(other, Canvas) else other
+        self.array[...] = source
+        return self
+
+    # ------------------------------------------------------------------
+    # Drawing primitives (all clip to the screen)
+    # ------------------------------------------------------------------
+
+    def clear(self):
+        """Fills the canvas with black"""
+        self.array.fill(0)
+        return self
+
+    def fill(self, color):
+        """Fills the whole canvas with an (R, G, B) color"""
+        self.array[...] = color
+        return self
+
+    def set_pixel(self, x, y, color):
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            self.array[y, x] = color
+
+    def get_pixel(self, x, y):
+        return tuple(int(c) for c in self.array[y, x])
+
+    def rect(self, x, y, w, h, color, fill=True):
+        """Draws a filled (or outlined) rectangle"""
+        clipped = _clip(x, y, w, h)
+        if clipped is None:
+            return self
+        x0, y0, x1, y1 = clipped
+        if fill:
+            self.array[y0:y1, x0:x1] = color
+        else:
+            self.hline(x, y, w, color)
+            self.hline(x, y + h - 1, w, color)
+            self.vline(x, y, h, color)
+            self.vline(x + w - 1, y, h, color)
+        return self
+
+    def hline(self, x, y, length, color):
+        return self.rect(x, y, length, 1, color)
+
+    def vline(self, x, y, length, color):
+        return self.rect(x, y, 1, length, color)
+
+    def line(self, x0, y0, x1, y1, color):
+        """Draws a straight line between two points (both ends included)"""
+        steps = max(abs(x1 - x0), abs(y1 - y0)) + 1
+        xs = np.rint(np.linspace(x0, x1, steps)).astype(np.intp)
+        ys = np.rint(np.linspace(y0, y1, steps)).astype(np.intp)
+        visible = (xs >= 0) & (xs < WIDTH) & (ys >= 0) & (ys < HEIGHT)
+        self.array[ys[visible], xs[visible]] = color
+        return self
+
+    def blit(self, source, x=0, y=0, mask=None):
+        """
+        Copies pixels from another canvas or an HxWx3 uint8 array
+
+        Args:
+            source: Canvas or array
+            x, y: destination of the source's top-left corner
+            mask: optional HxW boolean array; only True pixels are copied
+        """
+        pixels = source.array if isinstance(source, Canvas) else np.asarray(source)
+        h, w = pixels.shape[:2]
+        clipped = _clip(x, y, w, h)
+        if clipped is None:
+            return self
+        x0, y0, x1, y1 = clipped
+        src = pixels[y0 - y:y1 - y, x0 - x:x1 - x]
+        if mask is None:
+            self.array[y0:y1, x0:x1] = src
+        else:
+            region_mask = np.asarray(mask)[y0 - y:y1 - y, x0 - x:x1 - x]
+            self.array[y0:y1, x0:x1][region_mask] = src[region_mask]
+        return self
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def to_pic_data(self):
+        """Encodes the buffer as the base64 PicData string (no intermediate bytes copy)"""
+        return binascii.b2a_base64(self.view, newline=False).decode('ascii')
+
+    def tobytes(self):
+        return bytes(self.view)
+
+    def to_image(self):
+        """Returns a PIL image copy of the canvas"""
+        from PIL import Image
+        return Image.frombytes('RGB', (WIDTH, HEIGHT), self.tobytes())
+
+    def __eq__(self, other):
+        if not isinstance(other, Canvas):
+            return NotImplemented
+        return self.view == other.view
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<Canvas {WIDTH}x{HEIGHT} RGB24>"
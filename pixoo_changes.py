@@ -0,0 +1,210 @@
+"""
+DIVOOM PIXOO 64x64 change detection
+Suppresses commands and frames that would not change what the panel shows
+"""
+
+import hashlib
+import threading
+
+# Keys that do not affect what is displayed (PicID is only a sequence counter)
+_IGNORED_KEYS = {"PicID"}
+
+# Queries that never change the display
+_READ_ONLY = {"Channel/GetIndex", "Draw/GetHttpGifId", "Channel/GetAllConf", "Device/GetDeviceTime"}
+
+
+def fingerprint(value):
+    """Stable hash of a command dict, frame payload or any repr-able value"""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(value, dict):
+        for key in sorted(value):
+            if key in _IGNORED_KEYS:
+                continue
+            h.update(key.encode('utf-8'))
+            h.update(b'\0')
+            item = value[key]
+            h.update(item.encode('utf-8') if isinstance(item, str) else repr(item).encode('utf-8'))
+            h.update(b'\0')
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        h.update(value)
+    elif isinstance(value, str):
+        h.update(value.encode('utf-8'))
+    else:
+        h.update(repr(value).encode('utf-8'))
+    return h.hexdigest()
+
+
+def payload_size(command):
+    """Approximate request body size of a command, in bytes"""
+    return sum(len(str(key)) + len(str(value)) + 6 for key, value in command.items()) + 2
+
+
+def collapse_repeats(frames):
+    """
+    Shortens a looping frame sequence to its smallest repeating period
+
+    An animation whose frames repeat with period p plays identically when
+    only the first p frames are uploaded (a static animation collapses to
+    one frame). Returns the (possibly shorter) list.
+    """
+    frames = list(frames)
+    total = len(frames)
+    if total < 2:
+        return frames
+    hashes = [fingerprint(frame) for frame in frames]
+    for period in range(1, total // 2 + 1):
+        if total % period:
+            continue
+        if all(hashes[i] == hashes[i % period] for i in range(period, total)):
+            return frames[:period]
+    return frames
+
+
+class ChangeDetector:
+    """
+    Model of what each display "slot" currently shows
+
+    Slots: "display" (full-screen frame or animation), ("text", TextId),
+    "channel", "text_clear" and "gif_reset". A command is redundant when
+    its slot already holds the same fingerprint.
+    """
+
+    def __init__(self):
+        self._slots = {}
+        self._lock = threading.Lock()
+        self.requests_saved = 0
+        self.commands_saved = 0
+        self.frames_saved = 0
+        self.bytes_saved = 0
+
+    # ------------------------------------------------------------------
+    # Command classification
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def slot_for(command):
+        """Returns the slot a command sets, or None if it cannot be deduplicated"""
+        name = command.get("Command")
+        if name == "Draw/SendHttpGif":
+            return "display" if command.get("PicNum", 1) == 1 else None
+        if name == "Draw/SendHttpText":
+            return ("text", command.get("TextId", 1))
+        if name == "Channel/SetIndex":
+            return "channel"
+        if name == "Draw/ClearHttpText":
+            return "text_clear"
+        if name == "Draw/ResetHttpGifId":
+            return "gif_reset"
+        return None
+
+    def _apply(self, command):
+        # Chamado com o lock adquirido, após o dispositivo aceitar o comando
+        name = command.get("Command")
+        slot = self.slot_for(command)
+
+        if name in _READ_ONLY:
+            return
+        if name == "Draw/SendHttpGif":
+            self._slots.pop("gif_reset", None)
+            if slot is None:
+                self._slots.pop("display", None)  # Animação em andamento
+        elif name == "Draw/SendHttpText":
+            self._slots.pop("text_clear", None)
+        elif name == "Draw/ClearHttpText":
+            for key in [k for k in self._slots if isinstance(k, tuple) and k[0] == "text"]:
+                del self._slots[key]
+        elif name == "Draw/ResetHttpGifId":
+            self._slots.pop("display", None)
+        elif name == "Channel/SetIndex":
+            if self._slots.get("channel") != fingerprint(command):
+                self._slots.clear()  # Outro canal: nada do que sabemos vale mais
+        else:
+            self._slots.clear()  # Comando desconhecido: invalida tudo
+            return
+
+        if slot is not None:
+            self._slots[slot] = fingerprint(command)
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def is_redundant(self, command):
+        """True if sending the command would not change the panel"""
+        slot = self.slot_for(command)
+        if slot is None:
+            return False
+        with self._lock:
+            return self._slots.get(slot) == fingerprint(command)
+
+    def filter(self, commands):
+        """Returns only the commands that would change the panel, counting the rest as saved"""
+        pending = []
+        for command in commands:
+            if self.is_redundant(command):
+                self.note_saved(commands=1, nbytes=payload_size(command))
+            else:
+                pending.append(command)
+        if not pending:
+            self.note_saved(requests=1)
+        return pending
+
+    def record(self, commands):
+        """Updates the model after the device accepted the commands"""
+        with self._lock:
+            for command in commands:
+                self._apply(command)
+
+    def forget(self, commands):
+        """Invalidates the slots touched by commands that failed"""
+        with self._lock:
+            for command in commands:
+                if command.get("Command") in _READ_ONLY:
+                    continue
+                slot = self.slot_for(command)
+                if slot is None:
+                    self._slots.clear()
+                    return
+                self._slots.pop(slot, None)
+
+    # ------------------------------------------------------------------
+    # Logical content (e.g. an animation identified by its parameters)
+    # ------------------------------------------------------------------
+
+    def is_current(self, slot, content):
+        """True if the slot already shows the given content"""
+        with self._lock:
+            return self._slots.get(slot) == fingerprint(content)
+
+    def remember(self, slot, content):
+        with self._lock:
+            self._slots[slot] = fingerprint(content)
+
+    def invalidate(self, slot=None):
+        """Forgets one slot (or everything), forcing the next send"""
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+            else:
+                self._slots.pop(slot, None)
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+
+    def note_saved(self, requests=0, commands=0, frames=0, nbytes=0):
+        with self._lock:
+            self.requests_saved += requests
+            self.commands_saved += commands
+            self.frames_saved += frames
+            self.bytes_saved += nbytes
+
+    def stats(self):
+        """Returns how many requests, commands, frames and bytes were not sent"""
+        with self._lock:
+            return {
+                "requests_saved": self.requests_saved,
+                "commands_saved": self.commands_saved,
+                "frames_saved": self.frames_saved,
+                "bytes_saved": self.bytes_saved,
+            }
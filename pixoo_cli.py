@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+DIVOOM PIXOO 64x64 command line
+Non-interactive subcommands for scripts and cron jobs
+
+    python pixoo_cli.py text "Backup OK" --color "#00FF00"
+    python pixoo_cli.py --device wall animate plasma --frames 35
+
+Device selection, first match wins: --ip, --device NAME (from the config
+file), $PIXOO_IP, $PIXOO_DEVICE, the config file's "default" device.
+The config file ($PIXOO_CONFIG or ~/.config/pixoo/config.json) looks like
+    {"default": "desk", "devices": {"desk": "10.0.2.214", "wall": {"ip": "10.0.2.215", "port": 80}},
+     "profile": "led"}
+where the optional profile (a pixoo_color.PROFILES name or ColorProfile
+arguments) can be overridden with --profile or $PIXOO_PROFILE.
+
+Only the standard library is imported at startup; numpy, PIL, qrcode and
+requests are loaded by the subcommands that need them.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+DEFAULT_CONFIG = os.path.join(os.path.expanduser("~"), ".config", "pixoo", "config.json")
+
+
+def load_config(path=None):
+    """Reads the JSON config file ({} if the default file does not exist)"""
+    path = path or os.environ.get("PIXOO_CONFIG") or DEFAULT_CONFIG
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if path != DEFAULT_CONFIG:
+            raise
+        return {}
+
+
+def resolve_device(args, config):
+    """Returns (ip, port) for the selected device"""
+    if args.ip:
+        return args.ip, args.port or 80
+
+    if args.device is None and os.environ.get("PIXOO_IP"):
+        return os.environ["PIXOO_IP"], args.port or int(os.environ.get("PIXOO_PORT", 80))
+
+    devices = config.get("devices", {})
+    name = args.device or os.environ.get("PIXOO_DEVICE") or config.get("default")
+    if name is None and len(devices) == 1:
+        name = next(iter(devices))
+    if name is None:
+        raise SystemExit("pixoo: no device selected (use --ip, --device, $PIXOO_IP or a config file)")
+    if name not in devices:
+        raise SystemExit(f"pixoo: unknown device {name!r} (config has: {', '.join(devices) or 'none'})")
+
+    device = devices[name]
+    if isinstance(device, str):
+        device = {"ip": device}
+    return device["ip"], args.port or device.get("port", 80)
+
+
+def _prepare(pixoo, keep):
+    """Commands that put the device on a black custom screen (sent together with the content)"""
+    if keep:
+        return []
+    return [
+        {"Command": "Draw/ResetHttpGifId"},
+        {"Command": "Draw/ClearHttpText"},
+        {"Command": "Channel/SetIndex", "SelectIndex": 4},
+        pixoo.create_frame_command(pixoo.create_black_rgb_base64(), pic_id=1),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Subcommands (each returns True on success)
+# ---------------------------------------------------------------------------
+
+def cmd_text(pixoo, args):
+    command = pixoo.create_text_command(args.text, x=args.x, y=args.y, color=args.color, font_size=args.font_size,
+                                        align=args.align, speed=args.speed, text_id=args.text_id)
+    # Preparação, fundo e texto numa única requisição
+    return pixoo.send_commands(_prepare(pixoo, args.keep) + [command], dedupe=False) is not None
+
+
+def cmd_clock(pixoo, args):
+    if args.live:
+        stats = pixoo.live_clock(duration=args.duration, device_text=args.device_text)
+        return stats["errors"] == 0
+    from datetime import datetime
+
+    command = pixoo.create_text_command(datetime.now().strftime(args.format), y=15, font_size=6, color=args.color)
+    return pixoo.send_commands(_prepare(pixoo, args.keep) + [command], dedupe=False) is not None
+
+
+def cmd_pattern(pixoo, args):
+    from pixoo_render import PATTERNS
+
+    if args.name not in PATTERNS:
+        raise SystemExit(f"pixoo: unknown pattern {args.name!r} (choose from {', '.join(PATTERNS)})")
+    return pixoo.reset_device() and pixoo.send_pixel_matrix(args.name)
+
+
+def cmd_animate(pixoo, args):
+    from pixoo_animations import ANIMATIONS
+
+    if args.type not in ANIMATIONS:
+        raise SystemExit(f"pixoo: unknown animation {args.type!r} (choose from {', '.join(ANIMATIONS)})")
+    return pixoo.send_animation(args.type, total_frames=args.frames, fps=args.fps, workers=args.workers)
+
+
+def cmd_qr(pixoo, args):
+    import qrcode
+
+    level = getattr(qrcode.constants, f"ERROR_CORRECT_{args.error_correction}")
+    return pixoo.send_qr_code(args.data, error_correction=level)
+
+
+def cmd_frame(pixoo, args):
+    if args.path == "-":
+        data = sys.stdin.buffer.read()
+    else:
+        with open(args.path, "rb") as f:
+            data = f.read()
+
+    if len(data) != 64 * 64 * 3:
+        # Não é RGB cru: decodifica como imagem e ajusta a 64x64
+        import io
+        from PIL import Image
+        from pixoo_media import fit_frame
+
+        with Image.open(io.BytesIO(data)) as image:
+            data = fit_frame(image, fit=args.fit).tobytes()
+    return pixoo.reset_device() and pixoo.send_frame(data)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pixoo", description="Send content to a DIVOOM PIXOO 64x64")
+    parser.add_argument("--ip", help="device IP address")
+    parser.add_argument("--port", type=int, help="device HTTP port (default 80)")
+    parser.add_argument("--device", help="device name from the config file")
+    parser.add_argument("--config", help=f"config file (default $PIXOO_CONFIG or {DEFAULT_CONFIG})")
+    parser.add_argument("--timeout", type=float, default=5, help="request timeout in seconds")
+    parser.add_argument("--profile", help="output color profile (neutral, led, warm, night)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show progress messages")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    text = commands.add_parser("text", help="show a line of text (device font)")
+    text.add_argument("text")
+    text.add_argument("--x", type=int, default=0)
+    text.add_argument("--y", type=int, default=20)
+    text.add_argument("--color", default="#FFFFFF")
+    text.add_argument("--font-size", type=int, default=8)
+    text.add_argument("--align", type=int, default=2, help="1 left, 2 center, 3 right")
+    text.add_argument("--speed", type=int, default=70, help="marquee speed for long texts")
+    text.add_argument("--text-id", type=int, default=1)
+    text.add_argument("--keep", action="store_true", help="draw over the current screen instead of clearing it")
+    text.set_defaults(run=cmd_text)
+
+    clock = commands.add_parser("clock", help="show the current time")
+    clock.add_argument("--format", default="%H:%M:%S")
+    clock.add_argument("--color", default="#00FF00")
+    clock.add_argument("--keep", action="store_true", help="draw over the current screen instead of clearing it")
+    clock.add_argument("--live", action="store_true", help="keep updating every second")
+    clock.add_argument("--duration", type=float, help="seconds to run with --live (until Ctrl+C if omitted)")
+    clock.add_argument("--device-text", action="store_true", help="use the device fonts with --live")
+    clock.set_defaults(run=cmd_clock)
+
+    pattern = commands.add_parser("pattern", help="show a static pattern (gradient, checkerboard, border, test)")
+    pattern.add_argument("name")
+    pattern.set_defaults(run=cmd_pattern)
+
+    animate = commands.add_parser("animate", help="upload an animation (spinner, wave, plasma, bouncing_ball, ...)")
+    animate.add_argument("type")
+    animate.add_argument("--frames", type=int, default=30)
+    animate.add_argument("--fps", type=int)
+    animate.add_argument("--workers", type=int, help="render on a process pool of this size (0 = one per core)")
+    animate.set_defaults(run=cmd_animate)
+
+    qr = commands.add_parser("qr", help="show a QR code")
+    qr.add_argument("data")
+    qr.add_argument("--error-correction", choices="LMQH", default="L")
+    qr.set_defaults(run=cmd_qr)
+
+    frame = commands.add_parser("frame", help="show an image file, or 12288 raw RGB bytes ('-' reads stdin)")
+    frame.add_argument("path")
+    frame.add_argument("--fit", choices=("crop", "fit", "stretch"), default="crop")
+    frame.set_defaults(run=cmd_frame)
+
+    commands.add_parser("menu", help="interactive menu")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command in (None, "menu"):
+        from pixoo_controller import main as menu
+        return menu()
+
+    config = load_config(args.config)
+    ip, port = resolve_device(args, config)
+    profile = args.profile or os.environ.get("PIXOO_PROFILE") or config.get("profile")
+
+    from pixoo_controller import PixooController
+    from pixoo_transport import LightTransport
+
+    # Processo curto: uma conexão da biblioteca padrão basta, sem importar requests
+    try:
+        pixoo = PixooController(ip, port=port, verbose=args.verbose, color_profile=profile,
+                                transport=LightTransport(f"http://{ip}:{port}/post", timeout=args.timeout))
+    except (TypeError, ValueError) as e:
+        raise SystemExit(f"pixoo: {e}")
+    try:
+        ok = args.run(pixoo, args)
+    except KeyboardInterrupt:
+        ok = True
+    finally:
+        pixoo.close()
+    if not ok:
+        print(f"pixoo: {args.command} failed: {pixoo.last_error or 'device rejected the command'}", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+DIVOOM PIXOO 64x64 output color stage
+Per-channel gamma, white balance and brightness lookup tables with optional ordered dithering
+"""
+
+import binascii
+
+import numpy as np
+
+from pixoo_canvas import FRAME_BYTES, FRAME_SHAPE, HEIGHT, WIDTH
+
+# Índice na tabela achatada (3 x 256): valor do pixel + 256 * canal
+_CHANNEL_OFFSETS = np.array([0, 256, 512], dtype=np.uint16)
+
+# Bits fracionários mantidos pela tabela fina (usada com dithering)
+DITHER_BITS = 4
+
+# Matriz de Bayer 4x4 (limiares 0..15) repetida na tela inteira, igual nos três canais
+_BAYER4 = np.array([[0, 8, 2, 10],
+                    [12, 4, 14, 6],
+                    [3, 11, 1, 9],
+                    [15, 7, 13, 5]], dtype=np.uint16)
+BAYER_THRESHOLDS = np.tile(_BAYER4, (HEIGHT // 4, WIDTH // 4))[..., np.newaxis]
+
+
+def _per_channel(value):
+    if isinstance(value, (int, float)):
+        return (float(value),) * 3
+    value = tuple(float(v) for v in value)
+    if len(value) != 3:
+        raise ValueError(f"expected one value or three (R, G, B), got {value}")
+    return value
+
+
+class ColorProfile:
+    def __init__(self, gamma=1.0, white_balance=(1.0, 1.0, 1.0), brightness=1.0, dither=False, name="custom"):
+        """
+        Output color correction applied to every frame just before it is sent
+
+        All the math is folded into one 256-entry table per channel, built
+        once here, so correcting a frame is a single table lookup (plus a
+        threshold add and shift when dithering). Profiles are immutable:
+        use replace() to derive a dimmer or recalibrated one.
+
+        Args:
+            gamma: exponent applied to normalized values (one, or one per channel);
+                above 1 darkens mid-tones, as LED panels need for sRGB content
+            white_balance: per-channel gain (R, G, B), 1.0 = unchanged
+            brightness: overall gain, applied in linear light after gamma
+            dither: spread the rounding error with a 4x4 ordered (Bayer)
+                pattern, so dimmed or gamma-corrected gradients do not band
+            name: label shown in logs
+        """
+        self.gamma = _per_channel(gamma)
+        self.white_balance = _per_channel(white_balance)
+        self.brightness = float(brightness)
+        self.dither = bool(dither)
+        self.name = name
+        if min(self.gamma) <= 0 or min(self.white_balance) < 0 or self.brightness < 0:
+            raise ValueError("gamma must be positive, white balance and brightness non-negative")
+
+        # Identifies the correction (same key = same output)
+        self.key = (self.gamma, self.white_balance, self.brightness, self.dither)
+        self.identity = (self.gamma == (1.0,) * 3 and self.white_balance == (1.0,) * 3
+                         and self.brightness == 1.0 and not self.dither)
+
+        levels = np.arange(256) / 255.0
+        values = np.stack([
+            np.clip(255.0 * levels ** gamma * gain * self.brightness, 0, 255)
+            for gamma, gain in zip(self.gamma, self.white_balance)
+        ])
+        self.table = np.rint(values).astype(np.uint8).ravel()
+        # Valor * 16: os 4 bits de baixo guardam a fração que o dithering distribui
+        self.fine_table = np.rint(values * (1 << DITHER_BITS)).astype(np.uint16).ravel()
+
+    def replace(self, **changes):
+        """New profile with some parameters changed (e.g. replace(brightness=0.5))"""
+        params = {"gamma": self.gamma, "white_balance": self.white_balance, "brightness": self.brightness,
+                  "dither": self.dither, "name": self.name}
+        params.update(changes)
+        return ColorProfile(**params)
+
+    # ------------------------------------------------------------------
+    # Correction
+    # ------------------------------------------------------------------
+
+    def apply(self, frame):
+        """Corrects one frame (raw RGB bytes or 64x64x3 uint8 array); returns a new 64x64x3 array"""
+        pixels = np.frombuffer(frame, dtype=np.uint8) if isinstance(frame, (bytes, bytearray, memoryview)) \
+            else np.asarray(frame, dtype=np.uint8)
+        if pixels.size != FRAME_BYTES:
+            raise ValueError(f"frame must have {FRAME_BYTES} bytes, got {pixels.size}")
+        index = pixels.reshape(FRAME_SHAPE) + _CHANNEL_OFFSETS
+        if not self.dither:
+            return self.table.take(index)
+        fine = self.fine_table.take(index)
+        fine += BAYER_THRESHOLDS
+        fine >>= DITHER_BITS
+        return fine.astype(np.uint8)
+
+    def apply_pic_data(self, pic_data):
+        """Corrects a base64 PicData string"""
+        if self.identity:
+            return pic_data
+        frame = binascii.a2b_base64(pic_data)
+        if len(frame) != FRAME_BYTES:
+            return pic_data  # Não é um frame 64x64: o dispositivo decide
+        return binascii.b2a_base64(self.apply(frame).data, newline=False).decode('ascii')
+
+    def apply_color(self, color):
+        """Corrects a "#RRGGBB" color (device text); other formats are returned unchanged"""
+        if self.identity or not isinstance(color, str) or len(color) != 7 or color[0] != "#":
+            return color
+        try:
+            value = int(color[1:], 16)
+        except ValueError:
+            return color
+        channels = ((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+        r, g, b = (int(self.table[channel * 256 + level]) for channel, level in enumerate(channels))
+        return f"#{r:02X}{g:02X}{b:02X}"
+
+    def apply_command(self, command):
+        """Corrected copy of a frame or text command (the command itself if nothing changes)"""
+        if self.identity:
+            return command
+        name = command.get("Command")
+        if name == "Draw/SendHttpGif" and isinstance(command.get("PicData"), str):
+            return dict(command, PicData=self.apply_pic_data(command["PicData"]))
+        if name == "Draw/SendHttpText" and "color" in command:
+            return dict(command, color=self.apply_color(command["color"]))
+        if name == "Draw/CommandList":
+            return dict(command, CommandList=[self.apply_command(sub) for sub in command.get("CommandList", [])])
+        return command
+
+    def __repr__(self):
+        return (f"<ColorProfile {self.name!r} gamma={self.gamma} white_balance={self.white_balance} "
+                f"brightness={self.brightness} dither={self.dither}>")
+
+
+# Perfis prontos (por nome, ex. no pixoo_cli.py --profile)
+PROFILES = {
+    "neutral": ColorProfile(name="neutral"),
+    "led": ColorProfile(gamma=2.2, dither=True, name="led"),
+    "warm": ColorProfile(white_balance=(1.0, 0.88, 0.72), name="warm"),
+    "night": ColorProfile(gamma=2.2, brightness=0.35, dither=True, name="night"),
+}
+
+
+def get_profile(profile):
+    """Profile from a name in PROFILES, a dict of ColorProfile arguments or a ColorProfile (None passes through)"""
+    if profile is None or isinstance(profile, ColorProfile):
+        return profile
+    if isinstance(profile, dict):
+        return ColorProfile(**profile)
+    if profile not in PROFILES:
+        raise ValueError(f"unknown color profile {profile!r} (choose from {', '.join(PROFILES)})")
+    return PROFILES[profile]
@@ -0,0 +1,303 @@
+"""
+DIVOOM PIXOO 64x64 layer compositor
+Stacks backgrounds, overlays, text and QR codes with alpha into one frame,
+recomposing only the regions that changed
+"""
+
+import numpy as np
+
+from pixoo_canvas import HEIGHT, WIDTH, Canvas
+from pixoo_render import qr_modules
+from pixoo_text import ALIGN_CENTER, ALIGN_RIGHT, get_atlas, parse_color
+
+# Acima disso as regiões sujas são unidas num único retângulo
+MAX_DIRTY_RECTS = 8
+
+
+def _intersect(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[2], b[2]), min(a[3], b[3])
+    return (x0, y0, x1, y1) if x0 < x1 and y0 < y1 else None
+
+
+def _touches(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _union(a, b):
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+class Layer:
+    __slots__ = ("name", "z", "pixels", "alpha", "opacity", "x", "y", "visible")
+
+    def __init__(self, name, z):
+        """
+        One compositor layer: an HxWx3 uint8 image placed at (x, y)
+
+        alpha is an optional HxW uint8 coverage mask (None = opaque) and
+        opacity (0-255) scales the whole layer.
+        """
+        self.name = name
+        self.z = z
+        self.pixels = None
+        self.alpha = None
+        self.opacity = 255
+        self.x = 0
+        self.y = 0
+        self.visible = True
+
+    def bounds(self):
+        """Screen rectangle (x0, y0, x1, y1) of the layer's image, or None"""
+        if self.pixels is None:
+            return None
+        h, w = self.pixels.shape[:2]
+        return _intersect((self.x, self.y, self.x + w, self.y + h), (0, 0, WIDTH, HEIGHT))
+
+    def rect(self):
+        """Screen rectangle the layer currently contributes to, or None"""
+        if not self.visible or self.opacity == 0:
+            return None
+        return self.bounds()
+
+    def __repr__(self):
+        return f"<Layer {self.name!r} z={self.z} at ({self.x}, {self.y})>"
+
+
+class Compositor:
+    def __init__(self, background=(0, 0, 0)):
+        """
+        Layer stack composited into one 64x64 Canvas
+
+        Every change records the screen rectangle it affects (for content
+        updates, only the pixels that actually differ). compose() redraws
+        just those rectangles, blending the layers bottom to top, so a
+        ticking clock over a static background touches a few hundred
+        pixels per update.
+
+        Args:
+            background: color under every layer
+        """
+        self.background = np.array(parse_color(background), dtype=np.uint8)
+        self.canvas = Canvas()
+        self.canvas.array[...] = self.background
+        self.layers = {}
+        self.composed = 0           # compose() calls that redrew something
+        self.pixels_composed = 0    # Pixels redrawn in total
+        self._dirty = []
+        self._next_z = 0
+
+    # ------------------------------------------------------------------
+    # Dirty regions
+    # ------------------------------------------------------------------
+
+    def invalidate(self, rect=None):
+        """Marks a screen rectangle (the whole screen if None) for recomposition"""
+        rect = (0, 0, WIDTH, HEIGHT) if rect is None else _intersect(rect, (0, 0, WIDTH, HEIGHT))
+        if rect is None:
+            return
+        # Junta com os retângulos que encostam nele
+        merged = True
+        while merged:
+            merged = False
+            for other in self._dirty:
+                if _touches(rect, other):
+                    self._dirty.remove(other)
+                    rect = _union(rect, other)
+                    merged = True
+                    break
+        self._dirty.append(rect)
+        if len(self._dirty) > MAX_DIRTY_RECTS:
+            bounds = self._dirty[0]
+            for other in self._dirty[1:]:
+                bounds = _union(bounds, other)
+            self._dirty = [bounds]
+
+    @property
+    def dirty(self):
+        """True if compose() would change the output"""
+        return bool(self._dirty)
+
+    def dirty_rects(self):
+        return list(self._dirty)
+
+    # ------------------------------------------------------------------
+    # Layers
+    # ------------------------------------------------------------------
+
+    def layer(self, name, z=None):
+        """Returns the named layer, creating it on top of the stack (or at z)"""
+        layer = self.layers.get(name)
+        if layer is None:
+            if z is None:
+                z = self._next_z
+            self._next_z = max(self._next_z, z + 1)
+            layer = self.layers[name] = Layer(name, z)
+        elif z is not None and z != layer.z:
+            layer.z = z
+            self.invalidate(layer.rect())
+        return layer
+
+    def remove(self, name):
+        layer = self.layers.pop(name, None)
+        if layer is not None:
+            self.invalidate(layer.rect())
+
+    def set_visible(self, name, visible=True):
+        layer = self.layer(name)
+        if layer.visible != visible:
+            layer.visible = visible
+            self.invalidate(layer.bounds())
+
+    def set_opacity(self, name, opacity):
+        layer = self.layer(name)
+        opacity = max(0, min(255, int(opacity)))
+        if layer.opacity != opacity:
+            layer.opacity = opacity
+            self.invalidate(layer.bounds())
+
+    def move(self, name, x, y):
+        layer = self.layer(name)
+        if (layer.x, layer.y) != (x, y):
+            self.invalidate(layer.rect())
+            layer.x, layer.y = x, y
+            self.invalidate(layer.rect())
+
+    def set_pixels(self, name, pixels, alpha=None, x=0, y=0, z=None):
+        """
+        Sets a layer's image (Canvas, HxWx3 uint8 array or PIL image)
+
+        Returns True if anything on screen changes. When the size and
+        position are unchanged, only the bounding box of the pixels that
+        differ is marked for recomposition.
+        """
+        layer = self.layer(name, z)
+        pixels = _as_pixels(pixels)
+        if alpha is not None:
+            alpha = np.asarray(alpha, dtype=np.uint8)
+            if alpha.shape != pixels.shape[:2]:
+                raise ValueError(f"alpha shape {alpha.shape} does not match the layer {pixels.shape[:2]}")
+
+        old = layer.pixels
+        if (old is not None and old.shape == pixels.shape and (layer.x, layer.y) == (x, y)
+                and (layer.alpha is None) == (alpha is None)):
+            changed = np.any(old != pixels, axis=2)
+            if alpha is not None:
+                changed |= layer.alpha != alpha
+            rows = np.flatnonzero(changed.any(axis=1))
+            if not len(rows):
+                return False
+            cols = np.flatnonzero(changed.any(axis=0))
+            if layer.rect() is not None:
+                self.invalidate((x + int(cols[0]), y + int(rows[0]), x + int(cols[-1]) + 1, y + int(rows[-1]) + 1))
+        else:
+            self.invalidate(layer.rect())
+            layer.x, layer.y = x, y
+            layer.pixels = pixels
+            self.invalidate(layer.rect())
+
+        # Cópias próprias: o chamador pode reutilizar os buffers
+        layer.pixels = pixels if not pixels.flags.writeable else pixels.copy()
+        layer.alpha = None if alpha is None else alpha.copy()
+        return True
+
+    def set_frame(self, name, frame, z=None):
+        """Full-screen opaque layer (e.g. the current background animation frame)"""
+        return self.set_pixels(name, frame, z=z)
+
+    def set_fill(self, name, color, x=0, y=0, width=WIDTH, height=HEIGHT, z=None):
+        """Solid rectangle layer"""
+        pixels = np.broadcast_to(np.array(parse_color(color), dtype=np.uint8), (height, width, 3))
+        return self.set_pixels(name, pixels, x=x, y=y, z=z)
+
+    def set_text(self, name, text, x=0, y=0, color="#FFFFFF", font=None, size=8, align=1, z=None):
+        """Anti-aliased text layer, rasterized from the shared glyph atlas"""
+        mask = get_atlas(font, size).mask(text)
+        if align == ALIGN_CENTER:
+            x += (WIDTH - mask.shape[1]) // 2
+        elif align == ALIGN_RIGHT:
+            x += WIDTH - mask.shape[1]
+        pixels = np.broadcast_to(np.array(parse_color(color), dtype=np.uint8), mask.shape + (3,))
+        return self.set_pixels(name, pixels, alpha=mask, x=x, y=y, z=z)
+
+    def set_qr(self, name, data, x=None, y=None, scale=None, color="#FFFFFF", background="#000000",
+               error_correction=None, z=None):
+        """
+        QR code layer with square modules (largest integer scale, centered by default)
+
+        Raises ValueError when the code does not fit on the screen.
+        """
+        modules = qr_modules(data, error_correction)[0]
+        count = len(modules)
+        if count > min(WIDTH, HEIGHT):
+            raise ValueError(f"QR code has {count}x{count} modules, the screen fits 64x64")
+
+        scale = scale or min(WIDTH, HEIGHT) // count
+        blocks = modules.repeat(scale, axis=0).repeat(scale, axis=1)
+        size = blocks.shape[0]
+        pixels = np.where(blocks[..., np.newaxis],
+                          np.array(parse_color(color), dtype=np.uint8),
+                          np.array(parse_color(background), dtype=np.uint8))
+        x = (WIDTH - size) // 2 if x is None else x
+        y = (HEIGHT - size) // 2 if y is None else y
+        return self.set_pixels(name, pixels, x=x, y=y, z=z)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def _compose_rect(self, rect, stack):
+        x0, y0, x1, y1 = rect
+        out = self.canvas.array[y0:y1, x0:x1]
+        out[...] = self.background
+        for layer in stack:
+            area = _intersect(rect, layer.rect() or (0, 0, 0, 0))
+            if area is None:
+                continue
+            ax0, ay0, ax1, ay1 = area
+            target = self.canvas.array[ay0:ay1, ax0:ax1]
+            src = layer.pixels[ay0 - layer.y:ay1 - layer.y, ax0 - layer.x:ax1 - layer.x]
+            if layer.alpha is None and layer.opacity == 255:
+                target[...] = src
+                continue
+            if layer.alpha is None:
+                alpha = np.full(src.shape[:2], layer.opacity, dtype=np.uint16)
+            else:
+                alpha = layer.alpha[ay0 - layer.y:ay1 - layer.y, ax0 - layer.x:ax1 - layer.x].astype(np.uint16)
+                if layer.opacity != 255:
+                    alpha = alpha * layer.opacity // 255
+            alpha = alpha[..., np.newaxis]
+            target[...] = (src.astype(np.uint16) * alpha
+                           + target.astype(np.uint16) * (255 - alpha) + 127) // 255
+        return (x1 - x0) * (y1 - y0)
+
+    def compose(self):
+        """Recomposes the dirty regions and returns the output Canvas (reused between calls)"""
+        if self._dirty:
+            stack = sorted((layer for layer in self.layers.values() if layer.rect() is not None),
+                           key=lambda layer: layer.z)
+            for rect in self._dirty:
+                self.pixels_composed += self._compose_rect(rect, stack)
+            self._dirty = []
+            self.composed += 1
+        return self.canvas
+
+    def stats(self):
+        return {
+            "layers": len(self.layers),
+            "composed": self.composed,
+            "pixels_composed": self.pixels_composed,
+            "dirty_rects": len(self._dirty),
+        }
+
+
+def _as_pixels(pixels):
+    if isinstance(pixels, Canvas):
+        return pixels.array
+    if hasattr(pixels, "mode") and hasattr(pixels, "size"):
+        # Imagem PIL
+        pixels = pixels.convert("RGB") if pixels.mode != "RGB" else pixels
+    pixels = np.asarray(pixels, dtype=np.uint8)
+    if pixels.ndim != 3 or pixels.shape[2] != 3:
+        raise ValueError(f"layer pixels must be HxWx3, got {pixels.shape}")
+    return pixels
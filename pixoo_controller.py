@@ -4,44 +4,245 @@ DIVOOM PIXOO 64x64 Controller
 Solução melhorada para controlar o PIXOO via API WiFi
 """
 
-import requests
+import base64
 import json
+import os
 import time
-import base64
-import math
 import threading
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
-import io
-import qrcode
+from pixoo_cache import FrameCache
+from pixoo_metrics import MetricsRecorder
+from pixoo_pacing import AdaptivePacer
+from pixoo_state import DeviceState
+from pixoo_scheduler import CommandScheduler
+from pixoo_changes import ChangeDetector, collapse_repeats, fingerprint, payload_size
+from pixoo_transport import PixooTransport
+
+# numpy, PIL, qrcode e requests são importados só quando usados (ver pixoo_cli.py)
+
+
+def _pic_data(frame):
+    """PicData de um frame; pixoo_render (numpy) só é importado para frames ainda não codificados"""
+    if isinstance(frame, str):
+        return frame
+    from pixoo_render import to_pic_data
+    return to_pic_data(frame)
+
 
 class PixooController:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, pool_size=4, timeout=5, frame_cache=None, verbose=True, dedupe=True, port=80,
+                 metrics=None, pacer=None, retries=1, qr_cache=None, transport=None, color_profile=None):
         self.ip = ip_address
-        self.base_url = f"http://{ip_address}:80/post"
+        self.port = port
+        self.verbose = verbose  # False silencia as mensagens de progresso
+        self.last_error = None  # Último erro de comunicação
+        self._scratch = threading.local()
+        self.base_url = f"http://{ip_address}:{port}/post"
         self.current_fps = 20  # Default FPS setting
+        # Cache opcional de frames já codificados (FrameCache)
+        self.frame_cache = frame_cache
+        # Conexões keep-alive reutilizadas por todos os comandos (ou outro transporte, ex. LightTransport)
+        self.transport = transport if transport is not None else PixooTransport(self.base_url, pool_size=pool_size,
+                                                                                timeout=timeout)
+        # Detecção de mudanças: não reenvia o que já está na tela
+        self.changes = ChangeDetector() if dedupe else None
+        # Latência, bytes e erros por comando (pode ser compartilhado entre controladores)
+        self.metrics = metrics if metrics is not None else MetricsRecorder()
+        # Ritmo adaptativo no lugar das pausas fixas
+        self.pacer = pacer if pacer is not None else AdaptivePacer()
+        self.retries = retries  # Novas tentativas após falha de comunicação
+        # PicData pronto por (dados, correção de erro) dos QR codes já gerados
+        self.qr_cache = qr_cache if qr_cache is not None else FrameCache(max_bytes=8 * 1024 * 1024)
+        # Modelo do estado do dispositivo (canal, contador de GIF, textos, frame)
+        self.state = DeviceState()
+        # Fila opcional que serializa chamadas concorrentes (start_scheduler)
+        self.scheduler = None
+        # Observadores de tudo que foi enviado (gravação, emuladores espelho)
+        self.taps = []
+        # Correção de cor de saída (pixoo_color.ColorProfile), aplicada a cada frame no envio
+        self.color_profile = None
+        if color_profile is not None:
+            from pixoo_color import get_profile
+            self.color_profile = get_profile(color_profile)
         
-    def send_command(self, command_data):
+    def _log(self, message):
+        """Mostra mensagens de progresso (quando verbose)"""
+        if self.verbose:
+            print(message)
+    
+    def send_command(self, command_data, dedupe=True):
         """Envia um comando para o PIXOO"""
-        try:
-            response = requests.post(self.base_url, json=command_data, timeout=5)
-            return response.json() if response.status_code == 200 else None
-        except Exception as e:
-            print(f"Erro ao enviar comando: {e}")
-            return None
+        return self.send_commands([command_data], dedupe=dedupe)
     
-    def reset_device(self):
-        """Reset do dispositivo e preparação"""
-        commands = [
-            {"Command": "Draw/ResetHttpGifId"},
-            {"Command": "Draw/ClearHttpText"},
-            {"Command": "Channel/SetIndex", "SelectIndex": 4}
-        ]
+    def send_commands(self, commands, dedupe=True):
+        """
+        Envia vários comandos em uma única requisição (Draw/CommandList)
+        
+        Args:
+            commands: lista de comandos
+            dedupe: omite comandos que não mudariam o que está na tela
+        """
+        commands = list(commands)
+        if self._scheduled():
+            # Outra thread: passa pela fila, que agrupa e descarta comandos superados
+            return self.scheduler.submit(commands, dedupe=dedupe).result()
+        
+        if dedupe and self.changes is not None:
+            commands = self.changes.filter(commands)
+            if not commands:
+                return {"error_code": 0, "skipped": True}
+        
+        scheduler = self.scheduler
+        if scheduler is not None:
+            # No worker do agendador: respeita o intervalo mínimo entre requisições
+            scheduler.pace()
+        
+        profile = self.color_profile
+        if profile is None or profile.identity:
+            body = self.transport.encode(commands)
+        else:
+            # Última etapa antes da rede: caches e detecção de mudanças guardam o conteúdo sem correção
+            body = self.transport.encode([profile.apply_command(command) for command in commands])
+        for attempt in range(1 + self.retries):
+            # Espaçamento adaptativo: zero num dispositivo saudável, cresce quando ele sofre
+            self.pacer.wait()
+            start = time.perf_counter()
+            try:
+                result = self.transport.post_body(body)
+                if result is None:
+                    outcome = "http_error"
+                    self.last_error = "HTTP error from device"
+                elif result.get("error_code", 0) != 0:
+                    outcome = "device_error"
+                    self.last_error = f"Device error: {result.get('error_code')}"
+                else:
+                    outcome = "ok"
+            except Exception as e:
+                outcome = "timeout" if self.transport.is_timeout(e) else "error"
+                self.last_error = str(e)
+                self._log(f"Erro ao enviar comando: {e}")
+                result = None
+            latency = time.perf_counter() - start
+            self.metrics.record_request(commands, len(body), latency, outcome)
+            self.pacer.record(latency, outcome == "ok")
+            
+            # Erros de dados não melhoram com nova tentativa
+            if outcome in ("ok", "device_error"):
+                break
+        
+        if result is not None and result.get("error_code", 0) == 0:
+            self.state.apply(commands)
+            if self.changes is not None:
+                self.changes.record(commands)
+        else:
+            # Falha: o estado real é incerto, ressincroniza no próximo reset
+            self.state.invalidate()
+            if self.changes is not None:
+                self.changes.forget(commands)
+        
+        for tap in self.taps:
+            try:
+                tap(commands, result)
+            except Exception as e:
+                self._log(f"Erro no observador de comandos: {e}")
+        return result
+    
+    def add_tap(self, tap):
+        """
+        Registra tap(commands, result), chamado após cada requisição enviada
         
+        Comandos omitidos pela detecção de mudanças não chegam ao tap, e
+        os frames chegam antes da correção de cor.
+        """
+        self.taps.append(tap)
+        return tap
+    
+    def remove_tap(self, tap):
+        self.taps.remove(tap)
+    
+    def set_color_profile(self, profile):
+        """
+        Troca a correção de cor de saída (ColorProfile, nome de pixoo_color.PROFILES ou None)
+        
+        Só as tabelas mudam: nada é renderizado de novo e o cache de frames
+        continua válido. O que já está na tela muda no próximo envio.
+        """
+        if profile is not None:
+            from pixoo_color import get_profile
+            profile = get_profile(profile)
+        self.color_profile = profile
+        if self.changes is not None:
+            # Mesmo conteúdo com outras tabelas é outro frame para o dispositivo
+            self.changes.invalidate()
+        self._log(f"🎨 Perfil de cor: {profile.name if profile is not None else 'nenhum'}")
+        return profile
+    
+    def _scheduled(self):
+        """True quando o envio deve passar pelo agendador (chamada fora do worker dele)"""
+        scheduler = self.scheduler
+        return scheduler is not None and not scheduler.in_worker()
+    
+    def start_scheduler(self, max_batch=8, min_interval=0.0):
+        """
+        Passa a enviar tudo por uma fila com uma única thread de transporte
+        
+        Chamadas concorrentes (relógio, marquee, ...) são ordenadas por
+        prioridade; um texto pendente com o mesmo TextId ou um frame
+        pendente é substituído pelo mais novo, e comandos enfileirados
+        juntos saem numa única requisição. min_interval limita a taxa de
+        requisições ao dispositivo (segundos entre o início de duas).
+        """
+        if self.scheduler is None:
+            self.scheduler = CommandScheduler(self, max_batch=max_batch, min_interval=min_interval)
+        return self.scheduler
+    
+    def stop_scheduler(self, wait=True):
+        """Volta ao envio direto (envia o que estiver pendente se wait)"""
+        scheduler, self.scheduler = self.scheduler, None
+        if scheduler is not None:
+            scheduler.close(wait=wait)
+    
+    def close(self):
+        """Fecha as conexões com o PIXOO"""
+        self.stop_scheduler()
+        self.transport.close()
+    
+    def reset_device(self, settle=0, force=False):
+        """
+        Reset do dispositivo e preparação
+        
+        Args:
+            settle: pausa extra (s) após o reset; normalmente 0, o ritmo adaptativo cuida do resto
+            force: envia a sequência completa mesmo que o estado conhecido não exija
+        """
+        if force:
+            commands = [
+                {"Command": "Draw/ResetHttpGifId"},
+                {"Command": "Draw/ClearHttpText"},
+                {"Command": "Channel/SetIndex", "SelectIndex": 4}
+            ]
+        else:
+            # Só o que mudaria o dispositivo (canal 4, sem textos, contador de GIF válido)
+            commands = self.state.reset_commands()
+            if not commands:
+                self._log("✅ Dispositivo já preparado, reset dispensado")
+                return True
+        
+        # Uma única requisição para todos os comandos
+        result = self.send_commands(commands, dedupe=False)
         for cmd in commands:
-            result = self.send_command(cmd)
-            print(f"Comando {cmd['Command']}: {'OK' if result else 'ERRO'}")
-            time.sleep(0.5)
+            self._log(f"Comando {cmd['Command']}: {'OK' if result else 'ERRO'}")
+        if settle:
+            time.sleep(settle)
+        return result is not None
+    
+    def sync_state(self):
+        """Lê o canal e o contador de GIF do dispositivo, sem resetar nada"""
+        channel = self.send_command({"Command": "Channel/GetIndex"}, dedupe=False)
+        gif = self.send_command({"Command": "Draw/GetHttpGifId"}, dedupe=False)
+        self.state.sync(channel=channel.get("SelectIndex") if channel else None,
+                        gif_id=gif.get("PicId") if gif else None)
+        return self.state.snapshot()
     
     def create_black_rgb_base64(self):
         """Cria dados RGB 64x64 preto limpo (não GIF!)"""
@@ -50,34 +251,36 @@ class PixooController:
         # Cada pixel = 3 bytes (R,G,B)
         # Total = 12288 bytes
         
-        rgb_data = bytearray(64 * 64 * 3)  # Tudo zero = preto
-        return base64.b64encode(rgb_data).decode('utf-8')
+        return base64.b64encode(bytes(64 * 64 * 3)).decode('ascii')  # Tudo zero = preto
     
-    def send_clean_black_gif(self):
-        """Envia dados RGB pretos para preparar a tela"""
-        black_rgb_data = self.create_black_rgb_base64()
-        
-        gif_command = {
+    def create_frame_command(self, frame, pic_id=0):
+        """Cria o comando Draw/SendHttpGif para um frame estático"""
+        return {
             "Command": "Draw/SendHttpGif",
             "PicNum": 1,
             "PicWidth": 64,
             "PicOffset": 0,
-            "PicID": 0,
+            "PicID": pic_id,
             "PicSpeed": 1000,
-            "PicData": black_rgb_data
+            "PicData": _pic_data(frame)
         }
-        
-        result = self.send_command(gif_command)
-        print(f"GIF preto enviado: {'OK' if result else 'ERRO'}")
-        time.sleep(1)
+    
+    def create_black_gif_command(self):
+        """Cria o comando Draw/SendHttpGif com a tela preta"""
+        return self.create_frame_command(self.create_black_rgb_base64())
+    
+    def send_clean_black_gif(self):
+        """Envia dados RGB pretos para preparar a tela"""
+        result = self.send_static_frame(self.create_black_rgb_base64())
+        self._log(f"GIF preto enviado: {'OK' if result else 'ERRO'}")
         
         return result is not None
     
-    def send_text(self, text, x=0, y=20, color="#FFFFFF", font_size=8, align=2, speed=70):
-        """Envia texto para o display"""
-        text_command = {
+    def create_text_command(self, text, x=0, y=20, color="#FFFFFF", font_size=8, align=2, speed=70, text_id=1):
+        """Cria o comando Draw/SendHttpText"""
+        return {
             "Command": "Draw/SendHttpText",
-            "TextId": 1,
+            "TextId": text_id,
             "x": x,
             "y": y,
             "dir": 0,
@@ -88,9 +291,12 @@ class PixooController:
             "color": color,
             "align": align
         }
-        
+    
+    def send_text(self, text, x=0, y=20, color="#FFFFFF", font_size=8, align=2, speed=70, text_id=1):
+        """Envia texto para o display"""
+        text_command = self.create_text_command(text, x, y, color, font_size, align, speed, text_id)
         result = self.send_command(text_command)
-        print(f"Texto '{text}' enviado: {'OK' if result else 'ERRO'}")
+        self._log(f"Texto '{text}' enviado: {'OK' if result else 'ERRO'}")
         return result is not None
     
     def send_clock(self):
@@ -98,163 +304,221 @@ class PixooController:
         current_time = datetime.now().strftime("%H:%M:%S")
         return self.send_text(current_time, y=15, font_size=6, color="#00FF00")
     
+    def live_clock(self, duration=None, device_text=False, widgets=None, background=None):
+        """
+        Relógio/painel ao vivo, atualizado na virada de cada segundo
+        
+        Args:
+            duration: segundos de execução (até Ctrl+C se None)
+            device_text: usa as fontes do dispositivo em vez de renderizar localmente
+            widgets: lista de pixoo_dashboard.Widget (um relógio centralizado se None)
+            background: Canvas/array sob os widgets (renderização local)
+        
+        Só os widgets que mudaram são redesenhados e enviados; se o
+        dispositivo atrasar, segundos são pulados em vez de acumular.
+        """
+        from pixoo_dashboard import Dashboard
+        
+        dashboard = Dashboard(self, widgets, background=background, device_text=device_text)
+        self.reset_device()
+        self._log("🕐 Live clock (Ctrl+C to stop)")
+        stats = dashboard.run(duration)
+        self._log(f"📊 {stats['ticks']} ticks, {stats['updates']} updates, {stats['skipped']} skipped, "
+                  f"avg {stats['average_late'] * 1000:.1f}ms late")
+        return stats
+    
     def send_marquee(self, text, color="#FFFF00"):
         """Envia texto em marquee - PIXOO ativa automaticamente quando texto é longo"""
         # O PIXOO ativa marquee automaticamente quando o texto é maior que a tela
         return self.send_text(text, x=0, y=25, color=color, font_size=4, speed=100)
     
+    def send_rendered_text(self, text, x=0, y=20, color="#FFFFFF", font=None, size=8, align=2, background=None):
+        """
+        Desenha o texto localmente e envia como frame (qualquer fonte TrueType)
+        
+        Args:
+            font: caminho de uma fonte TrueType/OpenType (fonte padrão do Pillow se None)
+            size: tamanho da fonte em pixels
+            background: Canvas ou array 64x64x3 por baixo do texto
+        """
+        from pixoo_text import render_text
+        
+        frame = render_text(text, x, y, color, font, size, align, background)
+        result = self.send_static_frame(frame)
+        self._log(f"Texto renderizado '{text}' enviado: {'OK' if result else 'ERRO'}")
+        return result is not None
+    
+    def send_local_marquee(self, text, y=25, color="#FFFF00", font=None, size=8, step=1, background=None,
+                           fps=None, duration=None):
+        """
+        Marquee renderizado localmente e transmitido frame a frame
+        
+        Ao contrário de send_marquee, funciona com qualquer fonte e sobre
+        qualquer fundo. Sem duration, roda até Ctrl+C.
+        """
+        from pixoo_text import marquee_frames
+        
+        frames = marquee_frames(text, y, color, font, size, step, background, loop=True)
+        return self.stream(frames, fps=fps, duration=duration)
+    
+    def _scratch_canvas(self):
+        """Canvas reutilizável (um por thread) para frames que são codificados logo em seguida"""
+        canvas = getattr(self._scratch, "canvas", None)
+        if canvas is None:
+            from pixoo_canvas import Canvas
+            canvas = self._scratch.canvas = Canvas()
+        return canvas
+    
     def create_pixel_matrix(self, pattern):
         """Cria uma matriz de pixels customizada usando dados RGB brutos"""
-        rgb_data = bytearray(64 * 64 * 3)
+        from pixoo_render import render_pattern
         
-        # Aplicar padrão diretamente nos dados RGB
-        for y in range(64):
-            for x in range(64):
-                index = (y * 64 + x) * 3  # Posição no array RGB
-                
-                if pattern == "gradient":
-                    rgb_data[index] = min(255, x * 4)      # R
-                    rgb_data[index + 1] = min(255, y * 4)  # G  
-                    rgb_data[index + 2] = 128              # B
-                elif pattern == "checkerboard":
-                    if (x + y) % 2 == 0:
-                        rgb_data[index] = 255     # R
-                        rgb_data[index + 1] = 255 # G
-                        rgb_data[index + 2] = 255 # B
-                    # Else fica preto (0,0,0)
-                elif pattern == "border":
-                    if x == 0 or x == 63 or y == 0 or y == 63:
-                        rgb_data[index] = 0       # R
-                        rgb_data[index + 1] = 255 # G
-                        rgb_data[index + 2] = 255 # B
-                elif pattern == "test":
-                    # Padrão de teste simples
-                    rgb_data[index] = x * 4 if x < 64 else 255      # R
-                    rgb_data[index + 1] = y * 4 if y < 64 else 255  # G
-                    rgb_data[index + 2] = 64                        # B
-        
-        return base64.b64encode(rgb_data).decode('utf-8')
+        # Frame inteiro gerado de forma vetorizada (sem laço por pixel)
+        render = lambda: render_pattern(pattern, self._scratch_canvas()).to_pic_data()
+        if self.frame_cache is None:
+            return render()
+        return self.frame_cache.get_or_render("pattern", {"pattern": pattern}, 0, render)
     
     def send_pixel_matrix(self, pattern="gradient"):
         """Envia matriz de pixels customizada"""
-        pixel_data = self.create_pixel_matrix(pattern)
+        result = self.send_static_frame(self.create_pixel_matrix(pattern))
+        self._log(f"Matriz de pixels ({pattern}) enviada: {'OK' if result else 'ERRO'}")
+        return result is not None
+    
+    def send_frame(self, frame):
+        """Envia um frame estático (array uint8 64x64x3, bytes RGB ou PicData)"""
+        result = self.send_static_frame(frame)
+        self._log(f"Frame enviado: {'OK' if result else 'ERRO'}")
+        return result is not None
+    
+    def send_static_frame(self, frame):
+        """
+        Exibe um frame estático usando o próximo PicID livre
         
-        gif_command = {
-            "Command": "Draw/SendHttpGif",
-            "PicNum": 1,
-            "PicWidth": 64,
-            "PicOffset": 0,
-            "PicID": 0,
-            "PicSpeed": 1000,
-            "PicData": pixel_data
-        }
+        Evita um ResetHttpGifId antes de cada frame: o contador só é
+        reiniciado (na mesma requisição) quando está desconhecido ou esgotado.
+        Retorna a resposta do dispositivo (None em caso de erro).
+        """
+        command = self.create_frame_command(frame)
+        if self.changes is not None and self.changes.is_redundant(command):
+            self.changes.note_saved(requests=1, commands=1, nbytes=payload_size(command))
+            return {"error_code": 0, "skipped": True}
         
-        result = self.send_command(gif_command)
-        print(f"Matriz de pixels ({pattern}) enviada: {'OK' if result else 'ERRO'}")
+        if self._scheduled():
+            # O PicID é alocado pelo worker, na ordem real de envio
+            del command["PicID"]
+            return self.scheduler.submit([command], dedupe=False).result()
+        
+        commands = []
+        pic_id = self.state.next_pic_id()
+        if pic_id is None:
+            commands.append({"Command": "Draw/ResetHttpGifId"})
+            pic_id = 1
+        command["PicID"] = pic_id
+        commands.append(command)
+        return self.send_commands(commands, dedupe=False)
+    
+    def send_composition(self, compositor):
+        """
+        Envia a saída de um Compositor (pixoo_compositor)
+        
+        Só as regiões alteradas desde o último envio são recompostas; se
+        nada mudou, o frame é reconhecido como redundante e não é enviado.
+        """
+        frame = compositor.compose()
+        result = self.send_static_frame(frame)
+        self._log(f"Composição enviada: {'OK' if result else 'ERRO'}")
         return result is not None
     
     def clear_display(self):
         """Limpa completamente o display"""
         commands = [
             {"Command": "Draw/ClearHttpText"},
-            {"Command": "Draw/ResetHttpGifId"}
+            {"Command": "Draw/ResetHttpGifId"},
+            self.create_frame_command(self.create_black_rgb_base64(), pic_id=1)  # Tela preta limpa
         ]
         
-        for cmd in commands:
-            self.send_command(cmd)
-            time.sleep(0.5)
-        
-        # Enviar tela preta limpa
-        self.send_clean_black_gif()
+        result = self.send_commands(commands)
+        self._log(f"Display limpo: {'OK' if result else 'ERRO'}")
+        return result is not None
     
     def create_animation_frame(self, frame_num, total_frames, animation_type="spinner"):
         """Cria um frame de animação usando dados RGB brutos"""
-        rgb_data = bytearray(64 * 64 * 3)
+        from pixoo_animations import cache_params as animation_cache_params
+        from pixoo_render import render_animation_frame
         
-        if animation_type == "spinner":
-            # Círculo giratório
-            center_x, center_y = 32, 32
-            radius = 20
-            angle = (frame_num / total_frames) * 2 * math.pi
-            
-            for y in range(64):
-                for x in range(64):
-                    index = (y * 64 + x) * 3
-                    
-                    # Distância do centro
-                    dist = math.sqrt((x - center_x)**2 + (y - center_y)**2)
-                    
-                    if dist <= radius + 2 and dist >= radius - 2:
-                        # Anel base azul
-                        rgb_data[index + 2] = 100  # B
-                    
-                    # Ponto giratório
-                    point_x = center_x + int(radius * math.cos(angle))
-                    point_y = center_y + int(radius * math.sin(angle))
-                    
-                    if abs(x - point_x) <= 2 and abs(y - point_y) <= 2:
-                        rgb_data[index] = 255      # R
-                        rgb_data[index + 1] = 100  # G
-                        rgb_data[index + 2] = 0    # B
-        
-        elif animation_type == "wave":
-            # Onda senoidal
-            wave_offset = (frame_num / total_frames) * 4 * math.pi
-            
-            for y in range(64):
-                for x in range(64):
-                    index = (y * 64 + x) * 3
-                    
-                    # Calcular altura da onda
-                    wave_y = 32 + int(15 * math.sin((x / 64.0) * 2 * math.pi + wave_offset))
-                    
-                    if abs(y - wave_y) <= 1:
-                        intensity = 255 - abs(y - wave_y) * 100
-                        rgb_data[index] = 0           # R
-                        rgb_data[index + 1] = intensity  # G
-                        rgb_data[index + 2] = 255     # B
-        
-        elif animation_type == "plasma":
-            # Efeito plasma colorido
-            time_offset = (frame_num / total_frames) * 2 * math.pi
-            
-            for y in range(64):
-                for x in range(64):
-                    index = (y * 64 + x) * 3
-                    
-                    # Múltiplas ondas senoidais para efeito plasma
-                    value1 = math.sin((x / 16.0) + time_offset)
-                    value2 = math.sin((y / 8.0) + time_offset * 1.5)
-                    value3 = math.sin((x + y) / 16.0 + time_offset * 2)
-                    
-                    plasma = (value1 + value2 + value3) / 3.0
-                    
-                    # Converter para RGB
-                    rgb_data[index] = int(127 + 127 * math.sin(plasma * math.pi))      # R
-                    rgb_data[index + 1] = int(127 + 127 * math.sin(plasma * math.pi + 2))  # G
-                    rgb_data[index + 2] = int(127 + 127 * math.sin(plasma * math.pi + 4))  # B
-        
-        elif animation_type == "bouncing_ball":
-            # Bola quicando
-            ball_x = int(32 + 20 * math.sin((frame_num / total_frames) * 2 * math.pi))
-            ball_y = int(32 + abs(20 * math.sin((frame_num / total_frames) * 4 * math.pi)))
-            ball_radius = 4
-            
-            for y in range(64):
-                for x in range(64):
-                    index = (y * 64 + x) * 3
-                    
-                    # Bola
-                    dist = math.sqrt((x - ball_x)**2 + (y - ball_y)**2)
-                    if dist <= ball_radius:
-                        intensity = max(0, int(255 * (1 - dist / ball_radius)))
-                        rgb_data[index] = intensity     # R
-                        rgb_data[index + 1] = intensity # G
-                        rgb_data[index + 2] = 0         # B
-        
-        return base64.b64encode(rgb_data).decode('utf-8')
-    
-    def send_animation(self, animation_type="spinner", total_frames=30, fps=None):
+        render = lambda: render_animation_frame(
+            animation_type, frame_num, total_frames, self._scratch_canvas()).to_pic_data()
+        if self.frame_cache is None:
+            return render()
+        params = animation_cache_params(animation_type, total_frames)
+        return self.frame_cache.get_or_render("animation", params, frame_num, render)
+    
+    def animation_frames(self, animation_type, total_frames):
+        """
+        PicData dos frames de uma animação, em ordem
+        
+        Cada frame é derivado do anterior pelo plugin da animação. Com
+        frame_cache, uma animação já toda no cache nem é renderizada, e os
+        frames novos são guardados.
+        """
+        from pixoo_animations import cache_params as animation_cache_params
+        from pixoo_render import animation_frames
+        
+        cache = self.frame_cache
+        if cache is None:
+            return (frame.to_pic_data() for frame in animation_frames(animation_type, total_frames))
+        
+        # Inclui a classe do plugin e sua versão: frames de um plugin alterado não são reaproveitados
+        params = animation_cache_params(animation_type, total_frames)
+        keys = [cache.make_key("animation", params, frame) for frame in range(total_frames)]
+        cached = [cache.get(key) for key in keys]
+        if all(data is not None for data in cached):
+            return iter(cached)
+        
+        def frames():
+            for key, data, frame in zip(keys, cached, animation_frames(animation_type, total_frames)):
+                if data is None:
+                    data = frame.to_pic_data()
+                    cache.put(key, data)
+                yield data
+        return frames()
+    
+    def render_animation_parallel(self, animation_type, total_frames, workers=None):
+        """
+        Renderiza os frames de uma animação num pool de processos
+        
+        Devolve um iterador de PicData em ordem: o frame 0 pode ser enviado
+        enquanto os seguintes ainda estão sendo renderizados. Frames já no
+        cache não são renderizados de novo; os novos são guardados nele.
+        """
+        from pixoo_animations import cache_params as animation_cache_params
+        from pixoo_render import render_parallel
+        
+        cache = self.frame_cache
+        if cache is None:
+            return render_parallel(animation_type, total_frames, workers=workers)
+        
+        params = animation_cache_params(animation_type, total_frames)
+        keys = [cache.make_key("animation", params, frame) for frame in range(total_frames)]
+        cached = [cache.get(key) for key in keys]
+        # Submete os frames ausentes já agora, antes da primeira iteração
+        rendered = render_parallel(animation_type, total_frames, workers=workers,
+                                   frames=[frame for frame, data in enumerate(cached) if data is None])
+        
+        def frames():
+            try:
+                for key, data in zip(keys, cached):
+                    if data is None:
+                        data = next(rendered)
+                        cache.put(key, data)
+                    yield data
+            finally:
+                rendered.close()
+        return frames()
+    
+    def send_animation(self, animation_type="spinner", total_frames=30, fps=None, pipelined=True, prefetch_depth=4,
+                       workers=None):
         """
         Sends animation with dynamic frames
         
@@ -262,263 +526,321 @@ class PixooController:
             animation_type: "spinner", "wave", "plasma", "bouncing_ball"
             total_frames: total number of frames (max 40)
             fps: frames per second (uses current_fps if None)
+            pipelined: render upcoming frames on a worker while earlier ones are in flight
+            prefetch_depth: maximum number of frames rendered ahead
+            workers: render on a process pool of this size (0 = one per core); None renders on a thread
         """
         if fps is None:
             fps = self.current_fps
             
         if total_frames > 40:
-            print("⚠️  Limiting to 40 frames (PIXOO limit)")
+            self._log("⚠️  Limiting to 40 frames (PIXOO limit)")
             total_frames = 40
         
-        # Reset and preparation
-        self.reset_device()
+        # Mesma animação já na tela: nada a enviar
+        content = ("animation", animation_type, total_frames, fps)
+        if self.changes is not None and self.changes.is_current("display", content):
+            frame_bytes = payload_size(self.create_black_gif_command())
+            self.changes.note_saved(requests=total_frames + 1, frames=total_frames,
+                                    nbytes=total_frames * frame_bytes)
+            self._log(f"⏭️  '{animation_type}' already on screen, upload skipped")
+            return True
         
-        print(f"🎬 Sending '{animation_type}' animation with {total_frames} frames @ {fps}fps")
+        if workers is not None:
+            # Todos os frames distribuídos entre os núcleos, entregues em ordem
+            frames = self.render_animation_parallel(animation_type, total_frames, workers)
+        else:
+            frames = self.animation_frames(animation_type, total_frames)
+        if pipelined and workers is None:
+            from pixoo_render import prefetch
+            # Frames começam a ser gerados enquanto o reset está em andamento
+            frames = prefetch(frames, prefetch_depth)
         
-        # Gerar e enviar frames
-        for frame in range(total_frames):
-            frame_data = self.create_animation_frame(frame, total_frames, animation_type)
-            
-            gif_command = {
-                "Command": "Draw/SendHttpGif",
-                "PicNum": total_frames,  # Total de frames
-                "PicWidth": 64,
-                "PicOffset": frame,      # Frame atual
-                "PicID": 1,              # ID da animação
-                "PicSpeed": max(1, int(1000 / fps)),  # Velocidade em ms
-                "PicData": frame_data
-            }
-            
-            result = self.send_command(gif_command)
-            if result:
-                print(f"✅ Frame {frame + 1}/{total_frames} enviado")
-            else:
-                print(f"❌ Erro no frame {frame + 1}")
-                return False
+        # Reset and preparation (the command-list reply confirms the reset)
+        if not self.reset_device():
+            if hasattr(frames, "close"):
+                frames.close()
+            return False
+        
+        self._log(f"🎬 Sending '{animation_type}' animation with {total_frames} frames @ {fps}fps")
+        ok = self.upload_frames(frames, total_frames, fps)
+        if ok and self.changes is not None:
+            self.changes.remember("display", content)
+        return ok
+    
+    def upload_frames(self, frames, total_frames, fps=None, pic_id=None, content=None):
+        """
+        Uploads an ordered sequence of PicData frames as one animation
+        
+        Args:
+            frames: iterable of frames (PicData, Canvas, ...), in PicOffset order;
+                items may also be (frame, speed_ms) pairs, e.g. MediaFrame
+            total_frames: number of frames in the sequence (PicNum)
+            fps: frames per second (uses current_fps if None)
+            pic_id: animation ID (PicID; next free ID if None)
+            content: hashable identity of a streamed sequence (generator), used
+                to skip it when it is already on screen
+        
+        Lists are deduplicated first: an animation already on screen is not
+        re-sent, and a looping sequence is shortened to its repeating period.
+        Generators cannot be fingerprinted without consuming them, so they
+        are only skipped when content is given (send_animation and
+        send_media check their own identity before rendering).
+        """
+        if self._scheduled():
+            # Todos os frames de uma vez, sem comandos de outras threads no meio
+            return self.scheduler.call(self.upload_frames, frames, total_frames, fps, pic_id, content).result()
+        
+        if fps is None:
+            fps = self.current_fps
+        
+        if self.changes is None:
+            content = None
+        elif isinstance(frames, (list, tuple)):
+            # Pares (frame, duração), ex. MediaFrame, são separados antes de codificar;
+            # a duração faz parte da identidade de cada frame
+            timed = [frame if isinstance(frame, tuple) else (frame, None) for frame in frames]
+            frames = [(_pic_data(frame), speed) for frame, speed in timed]
+            keys = [(fingerprint(pic_data), speed) for pic_data, speed in frames]
+            content = ("frames", tuple(keys), fps)
+            if self.changes.is_current("display", content):
+                self.changes.note_saved(requests=len(frames), frames=len(frames),
+                                        nbytes=sum(len(pic_data) for pic_data, _ in frames))
+                self._log("⏭️  Animation already on screen, upload skipped")
+                return True
             
-            # Pequena pausa entre frames para não sobrecarregar
-            time.sleep(0.1)
+            period = len(collapse_repeats(keys))
+            if period < len(frames):
+                saved = len(frames) - period
+                self.changes.note_saved(requests=saved, frames=saved,
+                                        nbytes=sum(len(pic_data) for pic_data, _ in frames[period:]))
+                self._log(f"♻️  {len(frames)} frames repeat every {period}, sending {period}")
+                frames, total_frames = frames[:period], period
+        elif content is not None:
+            content = ("stream", content, total_frames, fps)
+            if self.changes.is_current("display", content):
+                self.changes.note_saved(requests=total_frames, frames=total_frames)
+                self._log("⏭️  Animation already on screen, upload skipped")
+                if hasattr(frames, "close"):
+                    frames.close()
+                return True
         
-        print(f"🚀 Animation '{animation_type}' complete!")
+        start = time.perf_counter()
+        try:
+            if pic_id is None:
+                pic_id = self.state.next_pic_id()
+                if pic_id is None:
+                    # Contador desconhecido ou esgotado
+                    if not self.send_command({"Command": "Draw/ResetHttpGifId"}, dedupe=False):
+                        self._log("❌ Erro ao reiniciar o contador de GIF")
+                        return False
+                    pic_id = 1
+            
+            default_speed = max(1, int(1000 / fps))
+            for frame, frame_data in enumerate(frames):
+                speed = default_speed
+                if isinstance(frame_data, tuple):
+                    # Duração própria do frame (GIF/vídeo de origem)
+                    frame_data, speed = frame_data[0], frame_data[1] or default_speed
+                gif_command = {
+                    "Command": "Draw/SendHttpGif",
+                    "PicNum": total_frames,  # Total de frames
+                    "PicWidth": 64,
+                    "PicOffset": frame,      # Frame atual
+                    "PicID": pic_id,         # ID da animação
+                    "PicSpeed": speed,       # Velocidade em ms
+                    "PicData": _pic_data(frame_data)
+                }
+                
+                # Cada frame segue assim que o dispositivo responde ao anterior
+                result = self.send_command(gif_command)
+                if result:
+                    self._log(f"✅ Frame {frame + 1}/{total_frames} enviado")
+                else:
+                    self._log(f"❌ Erro no frame {frame + 1}")
+                    return False
+        finally:
+            if hasattr(frames, "close"):
+                frames.close()
+        
+        elapsed = time.perf_counter() - start
+        self.metrics.record_animation(total_frames, elapsed)
+        self._log(f"🚀 Animation uploaded in {elapsed:.2f}s ({total_frames / elapsed if elapsed else 0:.1f} frames/s)")
+        if content is not None:
+            self.changes.remember("display", content)
         return True
     
+    def send_media(self, source, fit="crop", colors=None, max_frames=40, frame_duration=100):
+        """
+        Envia um GIF, imagem, sequência de imagens ou vídeo como animação
+        
+        Args:
+            source: arquivo, diretório, padrão glob ou lista de arquivos
+            fit: "crop" (preenche e corta), "fit" (bordas pretas) ou "stretch"
+            colors: reduz cada frame a este número de cores (None = cor cheia)
+            max_frames: frames enviados; fontes maiores são subamostradas
+            frame_duration: duração (ms) dos frames sem duração própria
+        
+        Os frames são decodificados um a um enquanto os anteriores são
+        enviados; com frame_cache os frames já processados são reutilizados.
+        """
+        from pixoo_media import MediaSource
+        from pixoo_render import prefetch
+        
+        media = MediaSource(source, fit=fit, max_frames=max_frames, colors=colors,
+                            frame_duration=frame_duration, frame_cache=self.frame_cache)
+        total_frames = len(media)
+        if not total_frames:
+            self._log(f"❌ Nenhum frame em {source}")
+            return False
+        
+        content = ("media", media.cache_params())
+        if self.changes is not None and self.changes.is_current("display", content):
+            self.changes.note_saved(requests=total_frames, frames=total_frames)
+            self._log("⏭️  Media already on screen, upload skipped")
+            return True
+        
+        self._log(f"🎞️  Sending {source} as {total_frames} frames")
+        ok = self.reset_device() and self.upload_frames(prefetch(media), total_frames)
+        if ok and self.changes is not None:
+            self.changes.remember("display", content)
+        return ok
+    
+    def stream(self, frames, fps=None, duration=None, buffer_size=2):
+        """
+        Streams frames live, one at a time, at a target FPS (no 40-frame limit)
+        
+        Args:
+            frames: iterable/generator of frames (uint8 arrays, raw RGB bytes or PicData)
+            fps: target frames per second (uses current_fps if None)
+            duration: seconds to stream (until the generator ends or Ctrl+C if None)
+            buffer_size: frames queued for the device before the oldest is dropped
+        """
+        from pixoo_stream import FrameStreamer
+        
+        streamer = FrameStreamer(self, frames, fps=fps, buffer_size=buffer_size)
+        self._log(f"📡 Streaming @ {streamer.fps}fps (Ctrl+C to stop)")
+        stats = streamer.run(duration)
+        self._log(f"📊 Sent {stats['sent']} frames, achieved {stats['average_fps']}fps "
+              f"(unchanged {stats['unchanged']}, dropped {stats['dropped']}, errors {stats['errors']})")
+        return stats
+    
     def set_fps(self, new_fps):
         """Set the global FPS setting"""
         if 1 <= new_fps <= 30:
             self.current_fps = new_fps
-            print(f"✅ FPS set to {new_fps}")
+            self._log(f"✅ FPS set to {new_fps}")
             return True
         else:
-            print("❌ FPS must be between 1 and 30")
+            self._log("❌ FPS must be between 1 and 30")
             return False
     
-    def send_qr_code(self, data, error_correction=qrcode.constants.ERROR_CORRECT_L):
+    def send_qr_code(self, data, error_correction=None, reset=True,
+                     save_debug=False, analyze=False):
         """
         Exibe um QR Code no display 64x64
         
         Args:
             data: String com os dados para o QR Code
-            error_correction: Nível de correção de erro (L, M, Q, H)
+            error_correction: Nível de correção de erro (qrcode.constants; L se None)
+            reset: prepara o dispositivo antes (sem custo se ele já está pronto)
+            save_debug: grava qr_current.bmp e qr_current.png no diretório atual
+            analyze: mostra a análise de aproveitamento da tela
+        
+        O PicData pronto fica em cache por (data, error_correction): um QR
+        repetido custa só o envio pela rede.
         """
+        from pixoo_render import qr_level
+        
         try:
-            print(f"🔄 Gerando QR Code para: '{data}'")
-            
-            # Reset do dispositivo antes de enviar QR code
-            print("🔄 Resetando dispositivo...")
-            self.reset_device()
-            time.sleep(0.5)  # Pausa para garantir reset completo
-            
-            # Criar QR Code OTIMIZADO para máximo aproveitamento
-            # - ERROR_CORRECT_L: Correção mínima (7% de dados redundantes)
-            # - border=0: SEM quiet zone (bordas de segurança)
-            # - Versão automática para dados mínimos
-            qr = qrcode.QRCode(
-                version=None,  # Auto-detectar versão mínima
-                error_correction=qrcode.constants.ERROR_CORRECT_L,  # Correção mínima
-                box_size=1,    # 1 pixel por módulo (será escalado depois)
-                border=0,      # ZERO border - sem quiet zone
-            )
-            
-            # Adicionar os dados
-            qr.add_data(data)
-            
-            # Fazer o QR Code com versão mínima possível
-            try:
-                qr.make(fit=True)  # Auto-ajustar para menor versão possível
-                print(f"📏 QR Code versão: {qr.version}")
-                print(f"📐 Módulos: {qr.modules_count}x{qr.modules_count}")
-                print(f"🔥 SEM bordas/quiet zone - máximo aproveitamento!")
-                print(f"⚡ Correção de erro mínima (L) - menos módulos")
+            # Nível resolvido na chave: None e ERROR_CORRECT_L são o mesmo QR
+            error_correction = qr_level(error_correction)
+            key = self.qr_cache.make_key("qr", {"data": data, "error_correction": error_correction})
+            qr_data = self.qr_cache.get(key)
+            canvas = None
+            
+            if qr_data is None or save_debug or analyze:
+                self._log(f"🔄 Gerando QR Code para: '{data}'")
+                from qrcode.exceptions import DataOverflowError
+                from pixoo_canvas import Canvas
+                from pixoo_render import draw_qr, qr_modules
+                try:
+                    modules, version = qr_modules(data, error_correction)
+                except DataOverflowError:
+                    self._log("⚠️  AVISO: Dados muito complexos para QR Code!")
+                    return False
                 
-            except qrcode.exceptions.DataOverflowError:
-                print("⚠️  AVISO: Dados muito complexos para QR Code mínimo!")
-                return False
-            
-            # Obter matriz QR sem bordas
-            qr_matrix = qr.get_matrix()
-            qr_modules = len(qr_matrix)  # Número real de módulos N x N
-            
-            print(f"🗂️  Módulos QR (sem bordas): {qr_modules}x{qr_modules}")
+                if len(modules) > 64:
+                    self._log(f"❌ QR Code muito grande: {len(modules)}x{len(modules)} módulos")
+                    self._log("❌ Reduza a quantidade de dados")
+                    return False
+                
+                # Cada módulo vira um bloco escala x escala escrito direto no framebuffer
+                canvas = draw_qr(Canvas(), modules)
+                qr_data = canvas.to_pic_data()
+                self.qr_cache.put(key, qr_data)
+                
+                if analyze:
+                    self._log_qr_analysis(canvas, len(modules), version)
+                if save_debug:
+                    self._save_qr_debug(canvas)
             
-            # MÁXIMO APROVEITAMENTO: Calcular maior escala inteira possível
-            if qr_modules > 64:
-                print(f"❌ QR Code muito grande: {qr_modules}x{qr_modules} módulos")
-                print(f"❌ Display suporta máximo: 64x64 módulos")
-                print(f"❌ Reduza a quantidade de dados")
+            if reset and not self.reset_device():
                 return False
             
-            # Calcular escala PERFEITA para máximo aproveitamento
-            scale_factor = 64 // qr_modules  # Maior fator inteiro possível
-            final_size = qr_modules * scale_factor  # Tamanho final em pixels
-            
-            # Calcular centralização perfeita
-            offset = (64 - final_size) // 2  # Offset para centralizar
-            
-            print(f"🎯 ESCALA PERFEITA: {scale_factor}x{scale_factor} pixels por módulo")
-            print(f"📏 QR final: {final_size}x{final_size} pixels")
-            print(f"📍 Centralizado com offset: {offset} pixels")
-            print(f"📊 Aproveitamento: {(final_size*final_size)/(64*64)*100:.1f}% da tela")
-            
-            # Exemplos de aproveitamento
-            if scale_factor == 1:
-                print(f"💯 PERFEITO: Cada módulo = 1 pixel (máxima resolução)")
-            elif scale_factor >= 3:
-                print(f"🔥 EXCELENTE: Módulos {scale_factor}x{scale_factor} - super visível!")
-            elif scale_factor >= 2:
-                print(f"✅ ÓTIMO: Módulos {scale_factor}x{scale_factor} - bem legível")
-            
-            # Informações técnicas
-            print(f"📋 Exemplo: QR {qr_modules}x{qr_modules} → {final_size}x{final_size} (escala {scale_factor})")
-            
-            # Criar canvas 64x64 RGB com fundo PRETO puro
-            canvas = Image.new('RGB', (64, 64), (0, 0, 0))
-            
-            # Desenhar QR Code com PIXELS QUADRADOS PERFEITOS
-            print("🎨 Renderizando QR Code com pixels quadrados perfeitos...")
-            
-            for module_row in range(qr_modules):
-                for module_col in range(qr_modules):
-                    # Determinar se módulo está ativo (True = dados, False = vazio)
-                    is_data_module = qr_matrix[module_row][module_col]
-                    
-                    # MONOCROMÁTICO: BRANCO para dados, PRETO para vazio
-                    pixel_color = (255, 255, 255) if is_data_module else (0, 0, 0)
-                    
-                    # Calcular posição do módulo no canvas (centralizado)
-                    start_x = offset + (module_col * scale_factor)
-                    start_y = offset + (module_row * scale_factor)
-                    
-                    # Desenhar módulo como bloco QUADRADO de pixels
-                    for pixel_y in range(scale_factor):
-                        for pixel_x in range(scale_factor):
-                            canvas_x = start_x + pixel_x
-                            canvas_y = start_y + pixel_y
-                            
-                            # Verificar se está dentro dos limites (deve sempre estar)
-                            if 0 <= canvas_x < 64 and 0 <= canvas_y < 64:
-                                canvas.putpixel((canvas_x, canvas_y), pixel_color)
-            
-            print(f"✅ QR Code renderizado: {final_size}x{final_size} pixels centralizados")
-            
-            # Salvar apenas um arquivo atual (sobrescrever anterior)
-            import os
-            current_dir = os.getcwd()
-            debug_filename = os.path.join(current_dir, "qr_current.bmp")
-            png_filename = os.path.join(current_dir, "qr_current.png")
-            
-            # Remover arquivo anterior se existir
-            for old_file in [debug_filename, png_filename]:
-                if os.path.exists(old_file):
-                    os.remove(old_file)
-            
-            # Salvar BMP (formato sem transparência, ideal para LED matrix)
-            canvas.save(debug_filename, 'BMP')
-            print(f"💾 QR Code salvo como: '{debug_filename}'")
-            
-            # Salvar PNG sem transparência (fundo sólido preto)
-            png_canvas = Image.new('RGB', (64, 64), (0, 0, 0))  # Garantir fundo preto sólido
-            png_canvas.paste(canvas, (0, 0))
-            png_canvas.save(png_filename, 'PNG')
-            print(f"💾 QR Code salvo como: '{png_filename}'")
-            
-            # Converter canvas para dados RGB brutos
-            print("🔄 Convertendo canvas para dados RGB...")
-            rgb_data = bytearray(64 * 64 * 3)
-            
-            for y in range(64):
-                for x in range(64):
-                    pixel = canvas.getpixel((x, y))
-                    index = (y * 64 + x) * 3
-                    rgb_data[index] = pixel[0]      # R
-                    rgb_data[index + 1] = pixel[1]  # G  
-                    rgb_data[index + 2] = pixel[2]  # B
-            
-            # Análise final de aproveitamento e qualidade
-            print("📊 ANÁLISE FINAL:")
-            
-            # Contar pixels de dados vs pixels vazios
-            data_pixels = 0
-            empty_pixels = 0
-            
-            for i in range(0, len(rgb_data), 3):
-                r, g, b = rgb_data[i], rgb_data[i+1], rgb_data[i+2]
-                if r == 255 and g == 255 and b == 255:  # Pixels brancos (dados)
-                    data_pixels += 1
-                else:  # Pixels pretos (vazio/fundo)
-                    empty_pixels += 1
-            
-            total_display_pixels = 64 * 64
-            used_pixels = final_size * final_size
-            unused_pixels = total_display_pixels - used_pixels
-            
-            print(f"🎯 Área QR utilizada: {used_pixels}/{total_display_pixels} pixels ({used_pixels/total_display_pixels*100:.1f}%)")
-            print(f"📈 Dados QR: {data_pixels} pixels brancos")
-            print(f"⬛ Fundo QR: {empty_pixels - unused_pixels} pixels pretos") 
-            print(f"🔲 Área não usada: {unused_pixels} pixels ({unused_pixels/total_display_pixels*100:.1f}%)")
-            
-            # Qualidade do QR Code
-            if data_pixels > 0 and empty_pixels > 0:
-                print("✅ QR Code MONOCROMÁTICO - pronto para display 64x64!")
-                print(f"💯 MÁXIMO APROVEITAMENTO ALCANÇADO!")
-            else:
-                print("⚠️  AVISO: Problema na geração do QR code!")
-            
-            # Enviar para o display
-            print("📡 Enviando para o PIXOO...")
-            qr_data = base64.b64encode(rgb_data).decode('utf-8')
-            print(f"📊 Tamanho dos dados base64: {len(qr_data)} chars")
-            
-            gif_command = {
-                "Command": "Draw/SendHttpGif",
-                "PicNum": 1,
-                "PicWidth": 64,
-                "PicOffset": 0,
-                "PicID": 0,
-                "PicSpeed": 1000,
-                "PicData": qr_data
-            }
-            
-            result = self.send_command(gif_command)
-            if result:
-                print(f"✅ QR Code enviado com sucesso para o PIXOO!")
-                print(f"📁 Arquivos salvos: qr_current.bmp e qr_current.png")
-                return True
-            else:
-                print("❌ Erro ao enviar QR Code para o dispositivo")
-                print(f"📁 Mas você pode verificar as imagens salvas: qr_current.bmp")
-                return False
+            result = self.send_static_frame(qr_data)
+            self._log(f"{'✅' if result else '❌'} QR Code enviado: {'OK' if result else 'ERRO'}")
+            return result is not None
                 
         except Exception as e:
-            print(f"❌ Erro ao gerar QR Code: {e}")
-            import traceback
-            traceback.print_exc()
+            self.last_error = str(e)
+            self._log(f"❌ Erro ao gerar QR Code: {e}")
+            if self.verbose:
+                import traceback
+                self._log(traceback.format_exc())
             return False
+    
+    def _save_qr_debug(self, canvas):
+        """Grava o QR atual como qr_current.bmp/png (sobrescreve os anteriores)"""
+        current_dir = os.getcwd()
+        image = canvas.to_image()
+        for filename, image_format in (("qr_current.bmp", "BMP"), ("qr_current.png", "PNG")):
+            path = os.path.join(current_dir, filename)
+            image.save(path, image_format)
+            self._log(f"💾 QR Code salvo como: '{path}'")
+    
+    def _log_qr_analysis(self, canvas, qr_modules_count, version):
+        """Mostra versão, escala e aproveitamento da tela"""
+        import numpy as np
+        from pixoo_render import qr_layout
+        
+        scale_factor, final_size, offset = qr_layout(qr_modules_count)
+        self._log(f"📏 QR Code versão: {version}")
+        self._log(f"🗂️  Módulos QR (sem bordas): {qr_modules_count}x{qr_modules_count}")
+        self._log(f"🎯 Escala: {scale_factor}x{scale_factor} pixels por módulo")
+        self._log(f"📏 QR final: {final_size}x{final_size} pixels, offset {offset}")
+        
+        # Contar pixels de dados (brancos) vs pixels vazios
+        data_pixels = int(np.all(canvas.array == 255, axis=2).sum())
+        total_display_pixels = 64 * 64
+        used_pixels = final_size * final_size
+        unused_pixels = total_display_pixels - used_pixels
+        
+        self._log("📊 ANÁLISE FINAL:")
+        self._log(f"🎯 Área QR utilizada: {used_pixels}/{total_display_pixels} pixels ({used_pixels/total_display_pixels*100:.1f}%)")
+        self._log(f"📈 Dados QR: {data_pixels} pixels brancos")
+        self._log(f"⬛ Fundo QR: {used_pixels - data_pixels} pixels pretos")
+        self._log(f"🔲 Área não usada: {unused_pixels} pixels ({unused_pixels/total_display_pixels*100:.1f}%)")
 
 def main():
-    # Your PIXOO IP address - change this to match your device
-    PIXOO_IP = "10.0.2.214"
+    from pixoo_render import loop_animation
     
-    pixoo = PixooController(PIXOO_IP)
+    # Your PIXOO IP address - change this to match your device (or set PIXOO_IP)
+    PIXOO_IP = os.environ.get("PIXOO_IP", "10.0.2.214")
+    # Rendered frames survive restarts here
+    FRAME_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pixoo_frames")
+    
+    pixoo = PixooController(PIXOO_IP, frame_cache=FrameCache(disk_dir=FRAME_CACHE_DIR))
     
     print("=== DIVOOM PIXOO 64x64 Controller ===")
     print(f"Connecting to: {PIXOO_IP}")
@@ -529,6 +851,7 @@ def main():
         print("1 - Reset and prepare device")
         print("2 - Send simple text")
         print("3 - Show clock")
+        print("L - Live clock (Ctrl+C to stop)")
         print("4 - Marquee text")
         print("5 - Pixel matrix (gradient)")
         print("6 - Pixel matrix (checkerboard)")  
@@ -539,7 +862,11 @@ def main():
         print("B - Animation: Wave")
         print("C - Animation: Plasma")
         print("D - Animation: Bouncing Ball")
+        print("S - Live stream: Plasma (Ctrl+C to stop)")
+        print("T - Local marquee (rendered text, Ctrl+C to stop)")
+        print("G - GIF / video / image file")
         print("Q - QR Code")
+        print("M - Show transport metrics")
         print("F - Set FPS (current: {})".format(pixoo.current_fps))
         print("0 - Exit")
         
@@ -547,7 +874,7 @@ def main():
         
         if choice == "1":
             print("Resetting device...")
-            pixoo.reset_device()
+            pixoo.reset_device(force=True)
             pixoo.send_clean_black_gif()
             
         elif choice == "2":
@@ -561,6 +888,9 @@ def main():
             pixoo.send_clean_black_gif()
             pixoo.send_clock()
             
+        elif choice.upper() == "L":
+            pixoo.live_clock()
+            
         elif choice == "4":
             text = input("Enter marquee text: ")
             pixoo.reset_device()
@@ -598,10 +928,32 @@ def main():
         elif choice.upper() == "D":
             pixoo.send_animation("bouncing_ball", total_frames=20)
             
+        elif choice.upper() == "S":
+            pixoo.reset_device()
+            pixoo.stream(loop_animation("plasma", total_frames=120))
+            
+        elif choice.upper() == "T":
+            text = input("Enter marquee text: ")
+            pixoo.reset_device()
+            pixoo.send_local_marquee(text)
+            
+        elif choice.upper() == "G":
+            path = input("Enter GIF, video or image path (or folder of images): ").strip()
+            try:
+                pixoo.send_media(path)
+            except (OSError, ImportError) as e:
+                print(f"❌ {e}")
+            
         elif choice.upper() == "Q":
             data = input("Enter data for QR Code (URL, text, etc.): ")
             pixoo.send_qr_code(data)
             
+        elif choice.upper() == "M":
+            pixoo.metrics.report()
+            pacing = pixoo.pacer.stats()
+            print(f"⏱️  Pacing gap: {pacing['delay'] * 1000:.0f}ms "
+                  f"(failures {pacing['failures']}, slow replies {pacing['slow_replies']})")
+            
         elif choice.upper() == "F":
             try:
                 new_fps = int(input(f"Enter new FPS (1-30, current: {pixoo.current_fps}): "))
@@ -611,6 +963,7 @@ def main():
             
         elif choice == "0":
             print("Goodbye!")
+            pixoo.close()
             break
         else:
             print("Invalid option!")
@@ -0,0 +1,247 @@
+"""
+DIVOOM PIXOO 64x64 live clock and dashboard
+Updates widgets on wall-clock second boundaries, sending only what changed
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+
+from pixoo_compositor import Compositor
+
+
+class SecondTicker:
+    def __init__(self, interval=1.0):
+        """
+        Wall-clock ticker aligned to multiples of interval (whole seconds by default)
+
+        Every deadline is a boundary of the system clock, recomputed from
+        time.time() before each sleep, so errors never accumulate. When the
+        caller falls more than one tick behind, the missed ticks are skipped
+        and counted instead of being delivered in a burst.
+        """
+        self.interval = interval
+        self.next_tick = None
+        self.ticks = 0
+        self.skipped = 0
+        self.max_late = 0.0
+        self._late_total = 0.0
+
+    def _align(self, now):
+        return math.floor(now / self.interval) * self.interval + self.interval
+
+    def wait(self, stop_event=None):
+        """Sleeps until the next boundary; returns its timestamp, or None if stop_event was set"""
+        now = time.time()
+        if self.next_tick is None or self.next_tick - now > 2 * self.interval:
+            # Início, ou o relógio do sistema voltou para trás
+            self.next_tick = self._align(now)
+        elif now >= self.next_tick + self.interval:
+            missed = int((now - self.next_tick) // self.interval)
+            self.skipped += missed
+            self.next_tick += missed * self.interval
+
+        delay = self.next_tick - time.time()
+        if delay > 0:
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return None
+            else:
+                time.sleep(delay)
+        elif stop_event is not None and stop_event.is_set():
+            return None
+
+        tick = self.next_tick
+        self.next_tick += self.interval
+        late = max(0.0, time.time() - tick)
+        self.ticks += 1
+        self._late_total += late
+        self.max_late = max(self.max_late, late)
+        return tick
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "average_late": self._late_total / self.ticks if self.ticks else 0.0,
+            "max_late": self.max_late,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Widgets
+# ---------------------------------------------------------------------------
+
+class Widget:
+    def __init__(self, name, x=0, y=0, color="#FFFFFF", font=None, size=8, align=1, interval=1):
+        """
+        One line of text on the dashboard
+
+        Subclasses implement text(now). The widget is re-evaluated every
+        interval seconds and only redrawn when its text changes.
+
+        Args:
+            name: layer name (and device TextId order in device-text mode)
+            x, y, color, font, size, align: as in pixoo_text.draw_text
+            interval: seconds between evaluations
+        """
+        self.name = name
+        self.x = x
+        self.y = y
+        self.color = color
+        self.font = font
+        self.size = size
+        self.align = align
+        self.interval = interval
+        self.current = None
+        self._slot = None       # Intervalo da grade (múltiplos de interval) já avaliado
+
+    def text(self, now):
+        raise NotImplementedError
+
+    def update(self, now):
+        """Re-evaluates the widget once per interval boundary; returns True if its text changed"""
+        # Alinhado à grade, não à última avaliação: um tick inicial fora da fronteira
+        # não adia a próxima; a folga absorve o erro acumulado dos ticks em float
+        slot = math.floor(now.timestamp() / self.interval + 1e-6)
+        if slot == self._slot:
+            return False
+        self._slot = slot
+        text = self.text(now)
+        if text == self.current:
+            return False
+        self.current = text
+        return True
+
+    def invalidate(self):
+        self.current = None
+        self._slot = None
+
+
+class Clock(Widget):
+    def __init__(self, name="clock", fmt="%H:%M:%S", x=0, y=28, color="#00FF00", **kwargs):
+        super().__init__(name, x, y, color, **kwargs)
+        self.fmt = fmt
+
+    def text(self, now):
+        return now.strftime(self.fmt)
+
+
+class Label(Widget):
+    def __init__(self, name, source, x=0, y=0, **kwargs):
+        """
+        Text from a string or a callable (called with no arguments)
+
+        Use interval to throttle expensive callables (e.g. a sensor read).
+        """
+        super().__init__(name, x, y, **kwargs)
+        self.source = source
+
+    def text(self, now):
+        return str(self.source() if callable(self.source) else self.source)
+
+
+# ---------------------------------------------------------------------------
+# Dashboard
+# ---------------------------------------------------------------------------
+
+class Dashboard:
+    def __init__(self, controller, widgets=None, background=None, device_text=False, interval=1.0):
+        """
+        Live dashboard redrawn on second boundaries
+
+        Args:
+            controller: PixooController used to send the updates
+            widgets: Widget list (a centered Clock if None)
+            background: Canvas/array under the widgets (local rendering only)
+            device_text: draw with the device fonts (Draw/SendHttpText, one
+                TextId per widget) instead of rendering frames locally
+            interval: seconds between ticks
+        """
+        self.controller = controller
+        self.widgets = list(widgets) if widgets is not None else [Clock(align=2)]
+        self.device_text = device_text
+        self.ticker = SecondTicker(interval)
+        self.compositor = Compositor()
+        if background is not None:
+            self.compositor.set_frame("background", background)
+
+        self.updates = 0     # Ticks em que algo mudou
+        self.idle = 0        # Ticks sem mudança (nada enviado)
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _device_commands(self, changed):
+        commands = []
+        for widget in changed:
+            text_id = self.widgets.index(widget) + 1
+            commands.append(self.controller.create_text_command(
+                widget.current, x=widget.x, y=widget.y, color=widget.color,
+                font_size=widget.size, align=widget.align, text_id=text_id))
+        return commands
+
+    def tick(self, now):
+        """Updates the widgets for one instant and sends what changed; returns True on success"""
+        changed = [widget for widget in self.widgets if widget.update(now)]
+        if not changed:
+            self.idle += 1
+            return True
+
+        self.updates += 1
+        if self.device_text:
+            # Só os textos que mudaram, numa única requisição
+            result = self.controller.send_commands(self._device_commands(changed))
+        else:
+            for widget in changed:
+                self.compositor.set_text(widget.name, widget.current, widget.x, widget.y,
+                                         widget.color, widget.font, widget.size, widget.align)
+            result = self.controller.send_static_frame(self.compositor.compose())
+
+        if result is None:
+            # Próximo tick redesenha tudo
+            self.errors += 1
+            for widget in self.widgets:
+                widget.invalidate()
+            return False
+        return True
+
+    def run(self, duration=None):
+        """
+        Runs in the foreground until duration elapses, stop() or Ctrl+C
+
+        Returns the final stats() dictionary.
+        """
+        self._stop.clear()
+        deadline = None if duration is None else time.monotonic() + duration
+        for widget in self.widgets:
+            widget.invalidate()
+        self.compositor.invalidate()
+        try:
+            self.tick(datetime.now())
+            while deadline is None or time.monotonic() < deadline:
+                tick = self.ticker.wait(self._stop)
+                if tick is None:
+                    break
+                # O envio é síncrono: um dispositivo lento faz o ticker pular segundos
+                self.tick(datetime.fromtimestamp(tick))
+        except KeyboardInterrupt:
+            pass
+        return self.stats()
+
+    def start(self):
+        """Runs in a background thread"""
+        self._thread = threading.Thread(target=self.run, name="pixoo-dashboard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        stats = self.ticker.stats()
+        stats.update(updates=self.updates, idle=self.idle, errors=self.errors)
+        return stats
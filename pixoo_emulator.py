@@ -0,0 +1,184 @@
+"""
+DIVOOM PIXOO 64x64 headless emulator
+In-memory device that applies the HTTP commands to a framebuffer and exports PNG/GIF snapshots
+"""
+
+import binascii
+import json
+import threading
+
+import numpy as np
+
+from pixoo_canvas import FRAME_BYTES, Canvas
+from pixoo_state import CUSTOM_CHANNEL
+from pixoo_transport import PixooTransport
+
+
+class VirtualPixoo:
+    def __init__(self):
+        """
+        Virtual display for offline previews and regression tests
+
+        Keeps the GIF layer (every frame of the current animation, with its
+        PicSpeed) and the device text layer. Texts are drawn with the local
+        rasterizer, so positions and colors match but glyph shapes only
+        approximate the firmware fonts, and marquees are shown static.
+        """
+        self.channel = CUSTOM_CHANNEL
+        self.gif_id = 0
+        self.pic_id = None      # Animação atualmente exibida
+        self.pic_num = 1
+        self.speed = 1000
+        self.frames = {}        # PicOffset -> bytes RGB
+        self.texts = {}         # TextId -> comando Draw/SendHttpText
+        self.brightness = 100
+        self.commands = 0
+        self._lock = threading.RLock()   # Reentrante: Draw/CommandList aplica os subcomandos com ele
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def apply(self, command):
+        """Applies one command; returns the reply a real device would send"""
+        name = command.get("Command")
+        with self._lock:
+            self.commands += 1
+            if name == "Draw/CommandList":
+                # A lista inteira é atômica para as outras threads
+                for sub in command.get("CommandList", []):
+                    reply = self.apply(sub)
+                    if reply.get("error_code", 0) != 0:
+                        return reply
+            elif name == "Draw/SendHttpGif":
+                try:
+                    data = binascii.a2b_base64(command["PicData"])
+                except (KeyError, binascii.Error):
+                    return {"error_code": "Request data illegal json"}
+                if len(data) != FRAME_BYTES:
+                    return {"error_code": "Request data illegal json"}
+                pic_id = command.get("PicID", 0)
+                if pic_id != self.pic_id:
+                    # Nova animação substitui a anterior
+                    self.pic_id = pic_id
+                    self.frames = {}
+                self.gif_id = max(self.gif_id, pic_id)
+                self.pic_num = max(1, command.get("PicNum", 1))
+                self.speed = max(1, command.get("PicSpeed", 1000))
+                self.frames[command.get("PicOffset", 0)] = data
+            elif name == "Draw/SendHttpText":
+                self.texts[command.get("TextId", 1)] = dict(command)
+            elif name == "Draw/ClearHttpText":
+                self.texts.clear()
+            elif name == "Draw/ResetHttpGifId":
+                self.gif_id = 0
+                self.pic_id = None
+            elif name == "Draw/GetHttpGifId":
+                return {"error_code": 0, "PicId": self.gif_id}
+            elif name == "Channel/SetIndex":
+                self.channel = command.get("SelectIndex", 0)
+            elif name == "Channel/GetIndex":
+                return {"error_code": 0, "SelectIndex": self.channel}
+            elif name == "Channel/SetBrightness":
+                self.brightness = command.get("Brightness", 100)
+            return {"error_code": 0}
+
+    def send_commands(self, commands, dedupe=False):
+        """Same call as PixooController.send_commands (e.g. as a replay target)"""
+        commands = list(commands)
+        if len(commands) == 1:
+            return self.apply(commands[0])
+        return self.apply({"Command": "Draw/CommandList", "CommandList": commands})
+
+    def send_command(self, command_data, dedupe=False):
+        return self.apply(command_data)
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def frame_count(self):
+        """Frames of the current animation received so far"""
+        return len(self.frames)
+
+    def render(self, offset=0):
+        """Composes the screen (GIF frame at PicOffset offset plus texts) into a new Canvas"""
+        from pixoo_text import draw_text
+
+        with self._lock:
+            data = self.frames.get(offset)
+            if data is None and self.frames:
+                data = self.frames[min(self.frames)]
+            texts = sorted(self.texts.items())
+        canvas = Canvas(bytearray(data)) if data is not None else Canvas()
+        for _, text in texts:
+            draw_text(canvas, text.get("TextString", ""), x=text.get("x", 0), y=text.get("y", 0),
+                      color=text.get("color", "#FFFFFF"), align=text.get("align", 1))
+        return canvas
+
+    def frame_at(self, seconds):
+        """Screen at a time into the animation loop"""
+        offsets = sorted(self.frames) or [0]
+        index = int(seconds * 1000 / self.speed) % len(offsets)
+        return self.render(offsets[index])
+
+    def save_png(self, path, scale=8, offset=0):
+        """Saves the screen, scaled up with square pixels"""
+        image = self.render(offset).to_image()
+        if scale > 1:
+            image = image.resize((image.width * scale, image.height * scale), 0)
+        image.save(path, "PNG")
+        return path
+
+    def save_gif(self, path, scale=8):
+        """Saves the current animation (every received frame, at its PicSpeed) as a looping GIF"""
+        offsets = sorted(self.frames) or [0]
+        images = []
+        for offset in offsets:
+            image = self.render(offset).to_image()
+            if scale > 1:
+                image = image.resize((image.width * scale, image.height * scale), 0)
+            images.append(image)
+        images[0].save(path, "GIF", save_all=True, append_images=images[1:],
+                       duration=self.speed, loop=0, disposal=1)
+        return path
+
+    def snapshot(self):
+        """Current screen as a 64x64x3 uint8 array"""
+        return np.array(self.render().array)
+
+
+class EmulatorTransport:
+    def __init__(self, device=None):
+        """
+        Drop-in replacement for PixooTransport that talks to a VirtualPixoo
+
+        Lets a PixooController run with no network and no panel:
+            pixoo.transport = EmulatorTransport(device)
+        """
+        self.device = device if device is not None else VirtualPixoo()
+        self.base_url = "emulator://pixoo"
+
+    encode = staticmethod(PixooTransport.encode)
+
+    @staticmethod
+    def is_timeout(error):
+        return False
+
+    def post_body(self, body):
+        return self.device.apply(json.loads(body))
+
+    def post(self, command_data):
+        return self.device.apply(command_data)
+
+    def post_batch(self, commands):
+        return self.device.send_commands(commands)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
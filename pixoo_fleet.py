@@ -0,0 +1,167 @@
+"""
+DIVOOM PIXOO 64x64 fleet control
+Drives many PIXOO devices concurrently from one process
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pixoo_controller import PixooController
+from pixoo_render import to_pic_data
+
+
+class PixooFleet:
+    def __init__(self, devices, max_workers=None, pool_size=2, timeout=5, frame_cache=None, verbose=False):
+        """
+        Group of PIXOO devices driven in parallel
+
+        Args:
+            devices: IP addresses ("ip" or "ip:port") and/or PixooController instances
+            max_workers: parallel device operations (one per device if None)
+            pool_size: keep-alive connections per device
+            timeout: per-request timeout in seconds
+            frame_cache: FrameCache shared by every device
+            verbose: print each controller's progress messages
+        """
+        self.controllers = {}   # "ip" (porta 80) ou "ip:porta" -> controlador
+        for device in devices:
+            if isinstance(device, PixooController):
+                controller = device
+            else:
+                ip, _, port = str(device).partition(":")
+                controller = PixooController(ip, port=int(port or 80), pool_size=pool_size, timeout=timeout,
+                                             frame_cache=frame_cache, verbose=verbose)
+            key = controller.ip if controller.port == 80 else f"{controller.ip}:{controller.port}"
+            if key in self.controllers:
+                raise ValueError(f"device {key} is listed twice")
+            self.controllers[key] = controller
+
+        self.frame_cache = frame_cache
+        self.last_results = {}
+        workers = max_workers or max(1, min(64, len(self.controllers)))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pixoo-fleet")
+
+    def __len__(self):
+        return len(self.controllers)
+
+    def _timed(self, ip, action):
+        controller = self.controllers[ip]
+        controller.last_error = None
+        start = time.perf_counter()
+        try:
+            value = action(controller)
+            error = None if value else (controller.last_error or "device rejected the command")
+        except Exception as e:
+            value, error = None, str(e)
+        return {
+            "ok": error is None,
+            "latency": time.perf_counter() - start,
+            "result": value,
+            "error": error,
+        }
+
+    def run_per_device(self, actions):
+        """
+        Runs a different action on each device in parallel
+
+        Args:
+            actions: {ip: callable(controller)}
+
+        Returns {ip: {"ok", "latency", "result", "error"}}
+        """
+        futures = {ip: self.executor.submit(self._timed, ip, action) for ip, action in actions.items()}
+        self.last_results = {ip: future.result() for ip, future in futures.items()}
+        return self.last_results
+
+    def run(self, action, devices=None):
+        """Runs the same action(controller) on every device (or a subset) in parallel"""
+        devices = self.controllers if devices is None else devices
+        return self.run_per_device({ip: action for ip in devices})
+
+    # ------------------------------------------------------------------
+    # Broadcast helpers: content is rendered/encoded once and shared
+    # ------------------------------------------------------------------
+
+    def _renderer(self):
+        return next(iter(self.controllers.values()))
+
+    def reset(self):
+        """Resets every device"""
+        return self.run(lambda controller: controller.reset_device())
+
+    def clear(self):
+        """Clears every display"""
+        return self.run(lambda controller: controller.clear_display())
+
+    def send_text(self, text, **kwargs):
+        """Sends the same text to every device (same arguments as send_text)"""
+        return self.run(lambda controller: controller.send_text(text, **kwargs))
+
+    def send_frame(self, frame):
+        """Sends one static frame, encoded once, to every device"""
+        pic_data = to_pic_data(frame)
+        return self.run(lambda controller: controller.send_frame(pic_data))
+
+    def send_frames(self, frames_by_device):
+        """Sends per-device static frames: {ip: frame}"""
+        encoded = {ip: to_pic_data(frame) for ip, frame in frames_by_device.items()}
+        return self.run_per_device({
+            ip: (lambda controller, pic_data=pic_data: controller.send_frame(pic_data))
+            for ip, pic_data in encoded.items()
+        })
+
+    def send_pixel_matrix(self, pattern="gradient"):
+        """Renders a pattern once and shows it on every device"""
+        return self.send_frame(self._renderer().create_pixel_matrix(pattern))
+
+    def send_animation(self, animation_type="spinner", total_frames=30, fps=None, workers=None):
+        """
+        Renders an animation once and uploads it to every device in parallel
+
+        workers renders the frames on a process pool of that size (0 = one per core).
+        """
+        total_frames = min(total_frames, 40)
+        renderer = self._renderer()
+        fps = fps or renderer.current_fps
+        if workers is not None:
+            frames = list(renderer.render_animation_parallel(animation_type, total_frames, workers))
+        else:
+            frames = list(renderer.animation_frames(animation_type, total_frames))
+
+        def upload(controller):
+            return (controller.reset_device()
+                    and controller.upload_frames(frames, total_frames, fps))
+
+        return self.run(upload)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(self, results=None):
+        """Prints a per-fleet summary of latency and failures"""
+        results = self.last_results if results is None else results
+        if not results:
+            print("No fleet results yet")
+            return
+
+        latencies = sorted(r["latency"] for r in results.values())
+        failures = {ip: r["error"] for ip, r in results.items() if not r["ok"]}
+        print(f"📡 {len(results) - len(failures)}/{len(results)} devices OK")
+        print(f"⏱️  Latency min {latencies[0] * 1000:.0f}ms / "
+              f"avg {sum(latencies) / len(latencies) * 1000:.0f}ms / "
+              f"max {latencies[-1] * 1000:.0f}ms")
+        for ip, error in failures.items():
+            print(f"❌ {ip}: {error}")
+
+    def close(self):
+        """Stops the worker pool and closes every device connection"""
+        self.executor.shutdown(wait=True)
+        for controller in self.controllers.values():
+            controller.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
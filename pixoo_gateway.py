@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+DIVOOM PIXOO 64x64 gateway
+Local HTTP/WebSocket daemon that lets many clients share each panel through one pooled controller
+
+HTTP:       POST /<op> or /<device>/<op> with a JSON body (raw RGB bytes for /frame)
+            GET  /status
+WebSocket:  GET  /ws, then one JSON message per operation ({"op": "text", "id": 1, ...});
+            binary messages are raw frames for the default device
+Clients name themselves with X-Pixoo-Client (or ?client=) and pick X-Pixoo-Priority high/normal/low.
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import math
+import struct
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import qrcode
+
+from pixoo_canvas import FRAME_BYTES
+from pixoo_controller import PixooController
+from pixoo_render import ANIMATIONS, PATTERNS
+from pixoo_scheduler import HIGH, LOW, NORMAL
+
+PRIORITIES = {"high": HIGH, "normal": NORMAL, "low": LOW}
+QR_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+MAX_FRAMES = 40     # Limite de PicNum do dispositivo
+MAX_FPS = 30        # Mesmo limite de PixooController.set_fps
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_MAX_MESSAGE = 1024 * 1024
+WS_TEXT, WS_BINARY, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class GatewayError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _number(params, name, default, low, high, kind=int):
+    """Parameter converted to kind and checked against [low, high] (GatewayError 400 otherwise)"""
+    value = params.get(name, default)
+    if value is None:
+        return None
+    try:
+        value = kind(value)
+    except (TypeError, ValueError):
+        raise GatewayError(400, f"{name} must be a number") from None
+    if not (math.isfinite(value) and low <= value <= high):
+        raise GatewayError(400, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _succeeded(result):
+    if isinstance(result, dict):
+        return result.get("error_code", 0) == 0
+    return bool(result)
+
+
+class _Device:
+    __slots__ = ("name", "controller", "lease_client", "lease_expires")
+
+    def __init__(self, name, controller):
+        self.name = name
+        self.controller = controller
+        self.lease_client = None
+        self.lease_expires = 0.0
+
+    def lease_holder(self):
+        if self.lease_client is not None and time.monotonic() >= self.lease_expires:
+            self.lease_client = None
+        return self.lease_client
+
+
+class PixooGateway:
+    def __init__(self, devices, host="127.0.0.1", port=8064, min_interval=0.05, max_batch=8,
+                 timeout=5, reply_timeout=60, frame_cache=None):
+        """
+        Shared front end for one or more PIXOO devices
+
+        Each device gets a single controller with one keep-alive connection
+        and a CommandScheduler, so every client goes through the same
+        queue: pending texts per TextId and pending display content (frame,
+        pattern, QR code, animation) are replaced by the newest one, and
+            if not commands:
+                return {"error_code": 0, "skipped": True}
+        
+        if self.scheduler is not None:
+            # No worker do agendador: respeita o intervalo mínimo entre requisições
+            self.scheduler.pace()
+        
+        profile = self.color_profile Clients can take a lease on a
+        device to get exclusive access for a while.
+
+        Args:
+            devices: {name: IP or PixooController}, or a list of IPs/controllers (named by IP)
+            host, port: bind address (port 0 picks a free port)
+            min_interval: minimum seconds between two requests to a device
+            max_batch: most commands packed into one request
+            timeout: per-request timeout towards the devices
+            reply_timeout: longest a client waits for the device reply
+            frame_cache: FrameCache shared by every device
+        """
+        if not isinstance(devices, dict):
+            devices = {getattr(device, "ip", device): device for device in devices}
+        if not devices:
+            raise ValueError("gateway needs at least one device")
+
+        self.devices = {}
+        for name, device in devices.items():
+            if isinstance(device, PixooController):
+                controller = device
+            else:
+                ip, _, device_port = str(device).partition(":")
+                controller = PixooController(ip, port=int(device_port or 80), pool_size=1, timeout=timeout,
+                                             frame_cache=frame_cache, verbose=False)
+            controller.start_scheduler(max_batch=max_batch, min_interval=min_interval)
+            self.devices[name] = _Device(name, controller)
+        self.default_device = next(iter(self.devices))
+
+        self.reply_timeout = reply_timeout
+        self.clients = {}   # Nome do cliente -> contadores
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return self.server.server_address[0]
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+
+    def _device(self, name):
+        device = self.devices.get(name or self.default_device)
+        if device is None:
+            raise GatewayError(404, f"unknown device {name!r}")
+        return device
+
+    def _count(self, client, key):
+        with self._lock:
+            counters = self.clients.setdefault(client, {"requests": 0, "rejected": 0, "errors": 0})
+            counters[key] += 1
+
+    def _op_text(self, device, params, priority, payload):
+        controller = device.controller
+        command = controller.create_text_command(
+            str(params["text"]), x=params.get("x", 0), y=params.get("y", 20), color=params.get("color", "#FFFFFF"),
+            font_size=params.get("font_size", 8), align=params.get("align", 2), speed=params.get("speed", 70),
+            text_id=params.get("text_id", 1))
+        return controller.scheduler.submit([command], priority=priority)
+
+    def _submit_frame(self, device, frame, priority):
+        controller = device.controller
+        command = controller.create_frame_command(frame)
+        if controller.changes is not None and controller.changes.is_redundant(command):
+            return _done({"error_code": 0, "skipped": True})
+        # O PicID é alocado pelo worker, na ordem real de envio
+        del command["PicID"]
+        return controller.scheduler.submit([command], priority=priority, dedupe=False)
+
+    def _op_frame(self, device, params, priority, payload):
+        if payload is None:
+            try:
+                payload = base64.b64decode(params["pic_data"], validate=True)
+            except (KeyError, TypeError, binascii.Error):
+                raise GatewayError(400, "frame needs a raw RGB body or base64 pic_data") from None
+        if len(payload) != FRAME_BYTES:
+            raise GatewayError(400, f"frame must be {FRAME_BYTES} RGB bytes, got {len(payload)}")
+        return self._submit_frame(device, bytes(payload), priority)
+
+    def _op_pattern(self, device, params, priority, payload):
+        pattern = params.get("pattern", "gradient")
+        if pattern not in PATTERNS:
+            raise GatewayError(400, f"pattern must be one of {', '.join(PATTERNS)}")
+        return self._submit_frame(device, device.controller.create_pixel_matrix(pattern), priority)
+
+    def _op_animation(self, device, params, priority, payload):
+        animation_type = params.get("type", "spinner")
+        if animation_type not in ANIMATIONS:
+            raise GatewayError(400, f"type must be one of {', '.join(ANIMATIONS)}")
+        total_frames = _number(params, "total_frames", 30, 1, MAX_FRAMES)
+        fps = _number(params, "fps", None, 1, MAX_FPS)
+        # Upload inteiro no worker: os frames de outros clientes não se intercalam
+        return device.controller.scheduler.call(
+            device.controller.send_animation, animation_type, total_frames, fps,
+            priority=priority, coalesce="display")
+
+    def _op_qr(self, device, params, priority, payload):
+        level = str(params.get("error_correction", "L")).upper()
+        if level not in QR_LEVELS:
+            raise GatewayError(400, f"error_correction must be one of {', '.join(QR_LEVELS)}")
+        return device.controller.scheduler.call(
+            device.controller.send_qr_code, str(params["data"]), QR_LEVELS[level],
+            priority=priority, coalesce="display")
+
+    def _op_profile(self, device, params, priority, payload):
+        from pixoo_color import get_profile
+
+        # Perfil por nome ({"name": "night"}) ou por parâmetros ({"brightness": 0.5, "dither": true})
+        try:
+            profile = get_profile(params.get("name") or {key: value for key, value in params.items()
+                                                          if key not in ("wait", "device")})
+        except (TypeError, ValueError) as e:
+            raise GatewayError(400, str(e)) from None
+        # Pela fila: os frames já enfileirados saem com o perfil anterior
+        return device.controller.scheduler.call(device.controller.set_color_profile, profile, priority=priority)
+
+    def _op_clear(self, device, params, priority, payload):
+        return device.controller.scheduler.call(device.controller.clear_display, priority=priority,
+                                                coalesce="display")
+
+    OPERATIONS = {
+        "text": _op_text,
+        "frame": _op_frame,
+        "pattern": _op_pattern,
+        "animation": _op_animation,
+        "qr": _op_qr,
+        "clear": _op_clear,
+        "profile": _op_profile,
+    }
+
+    def _lease(self, device, client, params):
+        holder = device.lease_holder()
+        if holder not in (None, client):
+            raise GatewayError(409, f"device {device.name!r} is leased by {holder!r}")
+        seconds = params.get("seconds", 30)
+        try:
+            seconds = float(seconds)
+        except (TypeError, ValueError):
+            raise GatewayError(400, "seconds must be a number") from None
+        if not (math.isfinite(seconds) and seconds > 0):
+            raise GatewayError(400, "seconds must be a positive number")
+        device.lease_client = client
+        device.lease_expires = time.monotonic() + seconds
+        return {"ok": True, "device": device.name, "client": client, "seconds": seconds}
+
+    def _release(self, device, client):
+        if device.lease_holder() == client:
+            device.lease_client = None
+        return {"ok": True, "device": device.name}
+
+    def dispatch(self, op, params=None, device=None, client="anonymous", priority="normal", payload=None):
+        """
+        Runs one client operation and returns (HTTP status, reply dict)
+
+        op is one of OPERATIONS, "lease", "release" or "status"; payload
+        carries raw frame bytes. With params["wait"] false the operation
+        is queued and the reply does not wait for the device.
+        """
+        params = params or {}
+        if op == "status":
+            return 200, self.status()
+        try:
+            target = self._device(device or params.get("device"))
+            with self._lock:
+                if op == "lease":
+                    return 200, self._lease(target, client, params)
+                if op == "release":
+                    return 200, self._release(target, client)
+                holder = target.lease_holder()
+            handler = self.OPERATIONS.get(op)
+            if handler is None:
+                raise GatewayError(404, f"unknown operation {op!r}")
+            if holder not in (None, client):
+                raise GatewayError(409, f"device {target.name!r} is leased by {holder!r}")
+            if priority not in PRIORITIES:
+                raise GatewayError(400, f"priority must be one of {', '.join(PRIORITIES)}")
+
+            try:
+                future = handler(self, target, params, PRIORITIES[priority], payload)
+            except KeyError as e:
+                raise GatewayError(400, f"missing parameter {e}") from None
+        except GatewayError as e:
+            self._count(client, "rejected")
+            return e.status, {"ok": False, "error": str(e)}
+
+        self._count(client, "requests")
+        if params.get("wait", True) is False:
+            return 202, {"ok": True, "device": target.name, "queued": True}
+        try:
+            result = future.result(timeout=self.reply_timeout)
+        except TimeoutError:
+            self._count(client, "errors")
+            return 504, {"ok": False, "device": target.name, "error": "device did not answer in time"}
+        except Exception as e:
+            self._count(client, "errors")
+            return 502, {"ok": False, "device": target.name, "error": str(e)}
+        if not _succeeded(result):
+            self._count(client, "errors")
+            return 502, {"ok": False, "device": target.name,
+                         "error": target.controller.last_error or "device rejected the command"}
+        return 200, {"ok": True, "device": target.name,
+                     "skipped": isinstance(result, dict) and result.get("skipped", False)}
+
+    def status(self):
+        devices = {}
+        with self._lock:
+            for name, device in self.devices.items():
+                holder = device.lease_holder()
+                devices[name] = {
+                    "ip": device.controller.ip,
+                    "lease": None if holder is None else {
+                        "client": holder, "remaining": round(device.lease_expires - time.monotonic(), 3)},
+                    "scheduler": device.controller.scheduler.stats(),
+                    "last_error": device.controller.last_error,
+                    "color_profile": getattr(device.controller.color_profile, "name", None),
+                }
+            clients = {name: dict(counters) for name, counters in self.clients.items()}
+        return {"devices": devices, "clients": clients}
+
+    # ------------------------------------------------------------------
+    # HTTP / WebSocket
+    # ------------------------------------------------------------------
+
+    def _handler_class(self):
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _identity(self, query):
+                client = self.headers.get("X-Pixoo-Client") or query.get("client", [self.client_address[0]])[0]
+                priority = (self.headers.get("X-Pixoo-Priority") or query.get("priority", ["normal"])[0]).lower()
+                return client, priority
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/status":
+                    self._reply(200, gateway.status())
+                elif url.path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+                    self._websocket(*self._identity(parse_qs(url.query)))
+                else:
+                    self._reply(404, {"ok": False, "error": "not found"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                client, priority = self._identity(parse_qs(url.query))
+                parts = [part for part in url.path.split("/") if part]
+                if not 1 <= len(parts) <= 2:
+                    self._reply(404, {"ok": False, "error": "not found"})
+                    return
+                device, op = (None, parts[0]) if len(parts) == 1 else parts
+
+                params, payload = {}, None
+                if self.headers.get("Content-Type", "").startswith("application/octet-stream"):
+                    payload = body
+                elif body:
+                    try:
+                        params = json.loads(body)
+                    except ValueError:
+                        self._reply(400, {"ok": False, "error": "body is not valid JSON"})
+                        return
+                    if not isinstance(params, dict):
+                        self._reply(400, {"ok": False, "error": "body must be a JSON object"})
+                        return
+                self._reply(*gateway.dispatch(op, params, device, client, priority, payload))
+
+            # --- WebSocket (RFC 6455, sem extensões) ---
+
+            def _websocket(self, client, priority):
+                key = self.headers.get("Sec-WebSocket-Key", "")
+                accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+                self.send_response(101)
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", accept)
+                self.end_headers()
+                self.wfile.flush()
+                self.close_connection = True
+
+                while True:
+                    opcode, message = self._ws_read()
+                    if opcode is None or opcode == WS_CLOSE:
+                        self._ws_send(WS_CLOSE, b"")
+                        return
+                    if opcode == WS_PING:
+                        self._ws_send(WS_PONG, message)
+                        continue
+                    if opcode == WS_BINARY:
+                        status, reply = gateway.dispatch("frame", {}, None, client, priority, message)
+                    elif opcode == WS_TEXT:
+                        try:
+                            params = json.loads(message)
+                            if not isinstance(params, dict):
+                                raise ValueError
+                        except ValueError:
+                            self._ws_send(WS_TEXT, b'{"ok": false, "error": "message must be a JSON object"}')
+                            continue
+                        status, reply = gateway.dispatch(str(params.pop("op", "")), params, params.pop("device", None),
+                                                         client, str(params.pop("priority", priority)).lower())
+                        if "id" in params:
+                            reply["id"] = params["id"]
+                    else:
+                        continue
+                    reply["status"] = status
+                    self._ws_send(WS_TEXT, json.dumps(reply).encode("utf-8"))
+
+            def _ws_read(self):
+                """Next complete message as (opcode, bytes); (None, None) when the connection ends"""
+                chunks, opcode, size = [], None, 0
+                while True:
+                    header = self.rfile.read(2)
+                    if len(header) < 2:
+                        return None, None
+                    fin, frame_opcode = header[0] & 0x80, header[0] & 0x0F
+                    length = header[1] & 0x7F
+                    if length == 126:
+                        length = struct.unpack("!H", self.rfile.read(2))[0]
+                    elif length == 127:
+                        length = struct.unpack("!Q", self.rfile.read(8))[0]
+                    size += length
+                    if size > WS_MAX_MESSAGE:
+                        return None, None
+                    mask = self.rfile.read(4) if header[1] & 0x80 else None
+                    data = self.rfile.read(length)
+                    if len(data) < length:
+                        return None, None
+                    if mask:
+                        # Desmascara a mensagem inteira numa única operação com inteiros grandes
+                        key = (mask * (length // 4 + 1))[:length]
+                        data = (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+                    if frame_opcode >= WS_CLOSE:
+                        # Controle pode chegar no meio de uma mensagem fragmentada
+                        if frame_opcode == WS_PING:
+                            self._ws_send(WS_PONG, data)
+                            size -= length
+                            continue
+                        return frame_opcode, data
+                    if frame_opcode:
+                        opcode = frame_opcode
+                    chunks.append(data)
+                    if fin:
+                        return opcode, b"".join(chunks)
+
+            def _ws_send(self, opcode, data):
+                length = len(data)
+                if length < 126:
+                    header = struct.pack("!BB", 0x80 | opcode, length)
+                elif length < 65536:
+                    header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+                else:
+                    header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+                try:
+                    self.wfile.write(header + data)
+                    self.wfile.flush()
+                except OSError:
+                    pass
+
+            def log_message(self, format, *args):
+                pass  # Silencioso
+
+        return Handler
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Serves in a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="pixoo-gateway", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving, sends what is still queued and closes every device connection"""
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+        for device in self.devices.values():
+            device.controller.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local gateway shared by many clients of PIXOO devices")
+    parser.add_argument("devices", nargs="+", help="device IPs (ip[:port] or name=ip[:port])")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8064)
+    parser.add_argument("--min-interval", type=float, default=0.05, help="minimum seconds between device requests")
+    args = parser.parse_args()
+
+    devices = {}
+    for spec in args.devices:
+        name, _, address = spec.rpartition("=")
+        devices[name or address] = address
+
+    gateway = PixooGateway(devices, args.host, args.port, min_interval=args.min_interval)
+    print(f"🛰️  PIXOO gateway on {gateway.url} for {', '.join(devices)} (Ctrl+C to stop)")
+    try:
+        gateway.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+DIVOOM PIXOO 64x64 media ingest
+Decodes GIFs, image sequences and video lazily into 64x64 PicData frames
+"""
+
+import glob
+import hashlib
+import json
+import math
+import os
+from collections import namedtuple
+
+from PIL import Image, ImageOps
+
+from pixoo_canvas import HEIGHT, WIDTH, Canvas
+
+# Limite de frames de uma animação Draw/SendHttpGif
+MAX_FRAMES = 40
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff"}
+VIDEO_EXTENSIONS = {".mp4", ".m4v", ".mov", ".avi", ".mkv", ".webm"}
+
+# One preprocessed frame: PicData plus how long it stays on screen (PicSpeed, ms)
+MediaFrame = namedtuple("MediaFrame", ["pic_data", "speed"])
+
+
+# ---------------------------------------------------------------------------
+# Decoders: yield (PIL image, duration in ms) one frame at a time
+# ---------------------------------------------------------------------------
+
+def _decode_image(path, default_duration):
+    with Image.open(path) as image:
+        frames = getattr(image, "n_frames", 1)
+        for index in range(frames):
+            image.seek(index)
+            yield image, image.info.get("duration") or default_duration
+
+
+def _decode_sequence(paths, default_duration):
+    for path in paths:
+        with Image.open(path) as image:
+            yield image, default_duration
+
+
+def _decode_video(path, default_duration):
+    try:
+        import cv2
+    except ImportError:
+        raise ImportError("Video ingest needs OpenCV: pip install opencv-python") from None
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise OSError(f"Cannot open video: {path}")
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    duration = 1000.0 / fps if fps and fps > 0 else default_duration
+    try:
+        while True:
+            ok, bgr = capture.read()
+            if not ok:
+                break
+            yield Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)), duration
+    finally:
+        capture.release()
+
+
+def _video_length(path):
+    import cv2
+    capture = cv2.VideoCapture(path)
+    try:
+        return int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+    finally:
+        capture.release()
+
+
+# ---------------------------------------------------------------------------
+# Frame preprocessing
+# ---------------------------------------------------------------------------
+
+def fit_frame(image, fit="crop", resample=Image.Resampling.LANCZOS, colors=None):
+    """
+    Converts one source image to a 64x64 RGB image
+
+    Args:
+        image: PIL image in any mode (transparent pixels become black)
+        fit: "crop" (fill, center crop), "fit" (letterbox) or "stretch"
+        resample: Pillow resampling filter used when scaling
+        colors: quantize to this many colors (None keeps full color)
+    """
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (0, 0, 0, 255))
+        image = Image.alpha_composite(background, image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    if image.size != (WIDTH, HEIGHT):
+        if fit == "fit":
+            image = ImageOps.pad(image, (WIDTH, HEIGHT), method=resample, color=(0, 0, 0))
+        elif fit == "stretch":
+            image = image.resize((WIDTH, HEIGHT), resample)
+        else:
+            image = ImageOps.fit(image, (WIDTH, HEIGHT), method=resample)
+
+    if colors:
+        image = image.quantize(colors).convert("RGB")
+    return image
+
+
+def subsample(count, max_frames):
+    """Source frame indexes kept when count frames must fit in max_frames"""
+    if not max_frames or count <= max_frames:
+        return list(range(count))
+    return [math.floor(index * count / max_frames) for index in range(max_frames)]
+
+
+class MediaSource:
+    def __init__(self, source, fit="crop", max_frames=MAX_FRAMES, colors=None,
+                 frame_duration=100, frame_cache=None, resample=Image.Resampling.LANCZOS):
+        """
+        Lazy 64x64 frame source for a GIF, image, image sequence or video file
+
+        Frames are decoded, scaled and encoded one at a time, so only the
+        current source frame is ever in memory. When the source has more
+        than max_frames frames it is evenly subsampled, and the durations of
+        skipped frames are added to the kept ones so playback time is kept.
+
+        Args:
+            source: file path, directory of images, glob pattern or list of paths
+            fit: "crop", "fit" or "stretch" (see fit_frame)
+            max_frames: most frames produced (None for no limit, e.g. streaming)
+            colors: quantize every frame to this many colors
+            frame_duration: duration (ms) of frames that carry none (image sequences)
+            frame_cache: FrameCache storing the preprocessed frames
+            resample: Pillow resampling filter
+        """
+        self.fit = fit
+        self.max_frames = max_frames
+        self.colors = colors
+        self.frame_duration = frame_duration
+        self.frame_cache = frame_cache
+        self.resample = resample
+
+        self.kind, self.paths = self._classify(source)
+        self._length = None
+        self._frames = None     # Frames já decodificados, quando o tamanho precisou ser medido
+
+    @staticmethod
+    def _classify(source):
+        if isinstance(source, (list, tuple)):
+            return "sequence", [os.fspath(path) for path in source]
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            names = sorted(name for name in os.listdir(source)
+                           if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+            return "sequence", [os.path.join(source, name) for name in names]
+        if glob.has_magic(source):
+            return "sequence", sorted(glob.glob(source))
+        if os.path.splitext(source)[1].lower() in VIDEO_EXTENSIONS:
+            return "video", [source]
+        return "image", [source]
+
+    # ------------------------------------------------------------------
+    # Source inspection
+    # ------------------------------------------------------------------
+
+    def source_length(self):
+        """Number of frames in the source (None if the container does not say)"""
+        if self._length is None:
+            if self.kind == "sequence":
+                self._length = len(self.paths)
+            elif self.kind == "video":
+                self._length = _video_length(self.paths[0])
+            else:
+                with Image.open(self.paths[0]) as image:
+                    self._length = getattr(image, "n_frames", 1)
+        return self._length
+
+    def __len__(self):
+        """
+        Number of frames produced
+
+        Video frame counts come from the container and may be missing or
+        wrong, and PicNum must be right before the first frame is sent, so
+        a video is decoded first and the frames actually produced are
+        counted. Only the kept frames are held (at most max_frames encoded
+        frames; the source itself is still read one frame at a time) and
+        they are reused by the iteration. An uncapped video has no length
+        until it has been played: iterate it instead (e.g. for streaming).
+        """
+        if self.kind == "video" or self.source_length() is None:
+            if not self.max_frames:
+                raise TypeError("the length of a video without max_frames is unknown until it is decoded")
+            return len(self._materialize())
+        count = self.source_length()
+        return min(count, self.max_frames) if self.max_frames else count
+
+    def _decode(self):
+        if self.kind == "sequence":
+            return _decode_sequence(self.paths, self.frame_duration)
+        if self.kind == "video":
+            return _decode_video(self.paths[0], self.frame_duration)
+        return _decode_image(self.paths[0], self.frame_duration)
+
+    # ------------------------------------------------------------------
+    # Caching
+    # ------------------------------------------------------------------
+
+    def cache_params(self):
+        """JSON-serializable identity of the source and preprocessing options"""
+        files = hashlib.sha1()
+        for path in self.paths:
+            stat = os.stat(path)
+            files.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+        return {
+            "files": files.hexdigest(),
+            "fit": self.fit,
+            "max_frames": self.max_frames,
+            "colors": self.colors,
+            "frame_duration": self.frame_duration,
+            "resample": int(self.resample),
+        }
+
+    def _cached(self):
+        # Todos os frames no cache: nem abre o arquivo de origem
+        cache = self.frame_cache
+        params = self.cache_params()
+        manifest = cache.get(cache.make_key("media", params, "manifest"))
+        if manifest is None:
+            return None
+        speeds = json.loads(manifest)
+        frames = []
+        for index, speed in enumerate(speeds):
+            pic_data = cache.get(cache.make_key("media", params, index))
+            if pic_data is None:
+                return None
+            frames.append(MediaFrame(pic_data, speed))
+        return frames
+
+    # ------------------------------------------------------------------
+    # Frames
+    # ------------------------------------------------------------------
+
+    def _process(self):
+        count = self.source_length() if self.max_frames else None
+        kept = None if count is None else subsample(count, self.max_frames)
+        canvas = Canvas()
+
+        pending = None      # Frame mantido, aguardando a duração dos descartados
+        duration = 0.0
+        next_kept = 0
+        for index, (image, frame_duration) in enumerate(self._decode()):
+            if self.max_frames and count is None and index >= self.max_frames:
+                break  # Tamanho desconhecido: mantém só o início
+            if kept is None or (next_kept < len(kept) and index == kept[next_kept]):
+                if pending is not None:
+                    yield MediaFrame(pending, max(1, round(duration)))
+                next_kept += 1
+                canvas.paste_image(fit_frame(image, self.fit, self.resample, self.colors))
+                pending = canvas.to_pic_data()
+                duration = 0.0
+            duration += frame_duration
+        if pending is not None:
+            yield MediaFrame(pending, max(1, round(duration)))
+
+    def _materialize(self):
+        if self._frames is None:
+            self._frames = list(iter(self))  # list(self) chamaria __len__ de novo
+        return self._frames
+
+    def __iter__(self):
+        """Yields MediaFrame(pic_data, speed) tuples, decoding lazily"""
+        if self._frames is not None:
+            yield from self._frames
+            return
+        if self.frame_cache is None:
+            yield from self._process()
+            return
+
+        cached = self._cached()
+        if cached is not None:
+            yield from cached
+            return
+
+        cache = self.frame_cache
+        params = self.cache_params()
+        speeds = []
+        for index, frame in enumerate(self._process()):
+            cache.put(cache.make_key("media", params, index), frame.pic_data)
+            speeds.append(frame.speed)
+            yield frame
+        # O manifesto só é gravado depois que a sequência inteira foi processada
+        cache.put(cache.make_key("media", params, "manifest"), json.dumps(speeds))
+
+    def frames(self):
+        """Yields only the PicData strings (e.g. for live streaming)"""
+        for frame in self:
+            yield frame.pic_data
@@ -0,0 +1,190 @@
+"""
+DIVOOM PIXOO 64x64 metrics
+Per-command latency histograms, payload/error counters and achieved frame rate
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+
+# Upper bounds of the latency buckets, in milliseconds (last bucket is open)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value_ms):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples (capped at max)"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip([f"<={b}ms" for b in self.buckets] + ["inf"], self.counts)),
+        }
+
+
+class MetricsRecorder:
+    def __init__(self, fps_window=2.0):
+        """
+        Collects transport metrics for one or more controllers
+
+        Args:
+            fps_window: seconds of frame timestamps used for the live FPS figure
+        """
+        self.fps_window = fps_window
+        self._hooks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clears every counter"""
+        with self._lock:
+            self.latency = {}
+            self.requests = {}
+            self.commands = {}
+            self.bytes_sent = {}
+            self.errors = {}
+            self.timeouts = {}
+            self.frames_sent = 0
+            self.hook_errors = 0
+            self.last_animation = None
+            self._frame_times = deque()
+            self.started_at = time.time()
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+
+    def add_hook(self, hook):
+        """
+        Registers hook(event) called after every request
+
+        event: {"request": name, "commands": [names], "bytes": int,
+                "latency": seconds, "outcome": "ok" | "error" | "timeout" |
+                "http_error" | "device_error"}
+        """
+        self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_request(self, commands, nbytes, latency, outcome):
+        """Records one HTTP request carrying one or more commands"""
+        names = [command.get("Command", "?") for command in commands]
+        request = names[0] if len(names) == 1 else "Draw/CommandList"
+        now = time.monotonic()
+
+        with self._lock:
+            self.latency.setdefault(request, Histogram()).add(latency * 1000)
+            self.requests[request] = self.requests.get(request, 0) + 1
+            self.bytes_sent[request] = self.bytes_sent.get(request, 0) + nbytes
+            for name in names:
+                self.commands[name] = self.commands.get(name, 0) + 1
+            if outcome == "timeout":
+                self.timeouts[request] = self.timeouts.get(request, 0) + 1
+            elif outcome != "ok":
+                self.errors[request] = self.errors.get(request, 0) + 1
+            elif "Draw/SendHttpGif" in names:
+                self.frames_sent += names.count("Draw/SendHttpGif")
+                self._frame_times.append(now)
+                while self._frame_times and now - self._frame_times[0] > self.fps_window:
+                    self._frame_times.popleft()
+
+        if self._hooks:
+            event = {"request": request, "commands": names, "bytes": nbytes,
+                     "latency": latency, "outcome": outcome}
+            for hook in list(self._hooks):
+                try:
+                    hook(event)
+                except Exception:
+                    self.hook_errors += 1
+
+    def record_animation(self, frames, seconds):
+        """Records a completed multi-frame upload"""
+        with self._lock:
+            self.last_animation = {
+                "frames": frames,
+                "seconds": seconds,
+                "fps": frames / seconds if seconds > 0 else None,
+            }
+
+    def achieved_fps(self):
+        """Frames delivered per second over the recent window"""
+        with self._lock:
+            times = list(self._frame_times)
+        if len(times) < 2 or time.monotonic() - times[-1] > self.fps_window:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0]) if times[-1] > times[0] else 0.0
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """Returns every metric as a plain dictionary"""
+        fps = self.achieved_fps()
+        with self._lock:
+            return {
+                "uptime": time.time() - self.started_at,
+                "requests": dict(self.requests),
+                "commands": dict(self.commands),
+                "bytes_sent": dict(self.bytes_sent),
+                "errors": dict(self.errors),
+                "timeouts": dict(self.timeouts),
+                "latency": {name: hist.snapshot() for name, hist in self.latency.items()},
+                "frames_sent": self.frames_sent,
+                "achieved_fps": fps,
+                "last_animation": dict(self.last_animation) if self.last_animation else None,
+                "hook_errors": self.hook_errors,
+            }
+
+    def report(self):
+        """Prints a per-command summary table"""
+        snap = self.snapshot()
+        print(f"{'request':24} {'count':>6} {'p50':>8} {'p95':>8} {'max':>9} {'KB sent':>9} {'err':>4} {'t/o':>4}")
+        for name, hist in sorted(snap["latency"].items()):
+            print(f"{name:24} {hist['count']:6d} {hist['p50_ms']:6.1f}ms {hist['p95_ms']:6.1f}ms "
+                  f"{hist['max_ms']:7.1f}ms {snap['bytes_sent'].get(name, 0) / 1024:9.1f} "
+                  f"{snap['errors'].get(name, 0):4d} {snap['timeouts'].get(name, 0):4d}")
+        print(f"🎞️  Frames sent: {snap['frames_sent']} (live {snap['achieved_fps']:.1f}fps)")
+        if snap["last_animation"]:
+            animation = snap["last_animation"]
+            print(f"🎬 Last animation: {animation['frames']} frames in {animation['seconds']:.2f}s "
+                  f"({animation['fps'] or 0:.1f}fps)")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+DIVOOM PIXOO 64x64 mock device
+Local stand-in for the device's /post endpoint, with latency, jitter and error injection
+"""
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Commands the mock understands (everything the controller sends)
+KNOWN_COMMANDS = {
+    "Draw/SendHttpGif",
+    "Draw/SendHttpText",
+    "Draw/ClearHttpText",
+    "Draw/ResetHttpGifId",
+    "Draw/GetHttpGifId",
+    "Draw/CommandList",
+    "Channel/SetIndex",
+    "Channel/GetIndex",
+    "Channel/SetBrightness",
+}
+
+
+class MockPixooServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, timeout_rate=0.0, stall=10.0, seed=None, keep_log=False):
+        """
+        Fake PIXOO device served over HTTP
+
+        Args:
+            host, port: bind address (port 0 picks a free port)
+            latency: fixed delay per request in seconds
+            jitter: extra random delay per request, uniform in [0, jitter]
+            error_rate: probability of answering HTTP 500
+            timeout_rate: probability of stalling the request for `stall` seconds
+            seed: random seed for reproducible injection
+            keep_log: keep every received command in `log`
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.stall = stall
+        self.keep_log = keep_log
+        self.random = random.Random(seed)
+
+        self.log = []
+        self.stats = {"requests": 0, "commands": 0, "frames": 0, "bytes": 0, "errors": 0, "timeouts": 0}
+        # Estado simulado do dispositivo
+        self.state = {"channel": 0, "gif_id": 0, "texts": {}, "frame": None, "brightness": 100}
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return self.server.server_address[0]
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/post"
+
+    # ------------------------------------------------------------------
+    # Command handling
+    # ------------------------------------------------------------------
+
+    def _apply(self, command):
+        """Applies one command to the simulated state; returns the reply dict"""
+        name = command.get("Command")
+        if name not in KNOWN_COMMANDS:
+            return {"error_code": "Request data illegal json"}
+
+        self.stats["commands"] += 1
+        if self.keep_log:
+            self.log.append(command)
+
+        if name == "Draw/CommandList":
+            for sub in command.get("CommandList", []):
+                reply = self._apply(sub)
+                if reply.get("error_code", 0) != 0:
+                    return reply
+        elif name == "Draw/SendHttpGif":
+            try:
+                data = base64.b64decode(command["PicData"], validate=True)
+            except (KeyError, ValueError):
+                return {"error_code": "Request data illegal json"}
+            width = command.get("PicWidth", 64)
+            if len(data) != width * width * 3:
+                return {"error_code": "Request data illegal json"}
+            self.stats["frames"] += 1
+            self.state["gif_id"] = command.get("PicID", self.state["gif_id"])
+            if command.get("PicOffset", 0) == 0:
+                self.state["frame"] = data
+        elif name == "Draw/SendHttpText":
+            self.state["texts"][command.get("TextId", 1)] = command.get("TextString", "")
+        elif name == "Draw/ClearHttpText":
+            self.state["texts"].clear()
+        elif name == "Draw/ResetHttpGifId":
+            self.state["gif_id"] = 0
+        elif name == "Draw/GetHttpGifId":
+            return {"error_code": 0, "PicId": self.state["gif_id"]}
+        elif name == "Channel/SetIndex":
+            self.state["channel"] = command.get("SelectIndex", 0)
+        elif name == "Channel/GetIndex":
+            return {"error_code": 0, "SelectIndex": self.state["channel"]}
+        elif name == "Channel/SetBrightness":
+            self.state["brightness"] = command.get("Brightness", 100)
+        return {"error_code": 0}
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"     # Keep-alive, como o dispositivo
+            disable_nagle_algorithm = True
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                delay = mock.latency + (mock.random.uniform(0, mock.jitter) if mock.jitter else 0.0)
+                roll = mock.random.random()
+                with mock._lock:
+                    mock.stats["requests"] += 1
+                    mock.stats["bytes"] += len(body)
+
+                if roll < mock.timeout_rate:
+                    with mock._lock:
+                        mock.stats["timeouts"] += 1
+                    time.sleep(mock.stall)
+                elif delay:
+                    time.sleep(delay)
+
+                if roll >= mock.timeout_rate and roll < mock.timeout_rate + mock.error_rate:
+                    with mock._lock:
+                        mock.stats["errors"] += 1
+                    self._reply(500, {"error_code": "Injected error"})
+                    return
+
+                try:
+                    command = json.loads(body)
+                except ValueError:
+                    self._reply(200, {"error_code": "Request data illegal json"})
+                    return
+                with mock._lock:
+                    reply = mock._apply(command)
+                self._reply(200, reply)
+
+            def log_message(self, format, *args):
+                pass  # Silencioso
+
+        return Handler
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Serves in a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="pixoo-mock", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+            self.log.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock DIVOOM PIXOO 64x64 device")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="fixed delay per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra delay per request (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of HTTP 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="probability of stalling a request")
+    args = parser.parse_args()
+
+    mock = MockPixooServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, timeout_rate=args.timeout_rate)
+    print(f"🧪 Mock PIXOO listening on {mock.url} (Ctrl+C to stop)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
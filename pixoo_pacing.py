@@ -0,0 +1,102 @@
+"""
+DIVOOM PIXOO 64x64 adaptive pacing
+Spaces commands as tightly as the device accepts and backs off when it struggles
+"""
+
+import threading
+import time
+
+
+class AdaptivePacer:
+    def __init__(self, min_delay=0.0, max_delay=2.0, backoff=2.0, recovery=0.5,
+                 failure_floor=0.1, slow_factor=4.0, slow_floor=0.05, alpha=0.2):
+        """
+        Per-device gap between commands, driven by measured responses
+
+        Healthy replies shrink the gap geometrically towards min_delay.
+        Failures and timeouts grow it exponentially (at least failure_floor),
+        and replies much slower than the device's baseline latency grow it
+        proportionally, so a struggling device gets breathing room.
+
+        Args:
+            min_delay: gap on a healthy device, in seconds
+            max_delay: largest gap after repeated failures
+            backoff: gap multiplier on failure
+            recovery: gap multiplier on a healthy reply
+            failure_floor: smallest gap after a failure
+            slow_factor: a reply slower than slow_factor x baseline counts as "slow"
+            slow_floor: replies faster than this are never "slow"
+            alpha: smoothing factor of the latency moving average
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.recovery = recovery
+        self.failure_floor = failure_floor
+        self.slow_factor = slow_factor
+        self.slow_floor = slow_floor
+        self.alpha = alpha
+
+        self.delay = min_delay
+        self.latency = None     # Média móvel exponencial (s)
+        self.baseline = None    # Menor média observada (s)
+        self.failures = 0       # Falhas consecutivas
+        self.total_failures = 0
+        self.slow_replies = 0
+        self.waited = 0.0
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks until the device may receive the next command"""
+        with self._lock:
+            pause = self._next_allowed - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            with self._lock:
+                self.waited += pause
+
+    def record(self, latency, ok):
+        """Feeds one request outcome back into the pacer"""
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self.latency = latency if self.latency is None else (
+                    self.alpha * latency + (1 - self.alpha) * self.latency)
+                self.baseline = self.latency if self.baseline is None else min(self.baseline, self.latency)
+
+                if latency > self.slow_floor and latency > self.slow_factor * self.baseline:
+                    # Dispositivo respondendo bem mais devagar que o normal
+                    self.slow_replies += 1
+                    self.delay = min(self.max_delay, max(self.delay * self.backoff, latency / 2))
+                else:
+                    self.delay *= self.recovery
+                    if self.delay < max(self.min_delay, 0.001):
+                        self.delay = self.min_delay
+            else:
+                self.failures += 1
+                self.total_failures += 1
+                self.delay = min(self.max_delay, max(self.delay * self.backoff, self.failure_floor))
+
+            self._next_allowed = time.monotonic() + self.delay
+
+    def reset(self):
+        """Forgets the learned state (e.g. after the device was rebooted)"""
+        with self._lock:
+            self.delay = self.min_delay
+            self.latency = None
+            self.baseline = None
+            self.failures = 0
+            self._next_allowed = 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "delay": self.delay,
+                "latency": self.latency,
+                "baseline": self.baseline,
+                "consecutive_failures": self.failures,
+                "failures": self.total_failures,
+                "slow_replies": self.slow_replies,
+                "waited": self.waited,
+            }
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+DIVOOM PIXOO 64x64 command recorder and replayer
+Captures everything a controller sends into a compact binary log and plays it back
+
+Log layout (little-endian, append-only, readable through mmap):
+    header:  b"PIXOOLOG" | u16 version | u16 reserved | f64 wall-clock start
+    record:  f64 seconds since start | u8 flags | 3 pad | u32 json length | u32 payload length
+             | command JSON (PicData removed) | raw RGB payload (12288 bytes for a frame)
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+MAGIC = b"PIXOOLOG"
+LOG_VERSION = 1
+HEADER = struct.Struct("<8sHHd")
+RECORD = struct.Struct("<dBxxxII")
+
+# Flags de cada registro
+FLAG_OK = 1          # O dispositivo aceitou
+FLAG_BATCHED = 2     # Mesma requisição que o registro anterior (Draw/CommandList)
+FLAG_PAYLOAD = 4     # PicData guardado em binário após o JSON
+
+Record = namedtuple("Record", ["time", "command", "ok", "batched"])
+
+
+def _split_payload(command):
+    # PicData (base64) vira bytes crus: 25% menor e legível direto do mmap
+    pic_data = command.get("PicData")
+    if not isinstance(pic_data, str):
+        return command, b""
+    stripped = dict(command)
+    del stripped["PicData"]
+    return stripped, binascii.a2b_base64(pic_data)
+
+
+class CommandRecorder:
+    def __init__(self, path):
+        """
+        Append-only recorder of every command a controller sends
+
+        Attach it to one or more controllers; commands skipped by change
+        detection are never sent and therefore not recorded. Appending to
+        an existing log keeps its original start time.
+        """
+        self.path = path
+        self.records = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._controllers = []
+
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        self._file = open(path, "ab")
+        if exists:
+            with open(path, "rb") as existing:
+                magic, version, _, started = HEADER.unpack(existing.read(HEADER.size))
+            if magic != MAGIC or version != LOG_VERSION:
+                self._file.close()
+                raise ValueError(f"{path} is not a PIXOO command log")
+            self.started = started
+        else:
+            self.started = time.time()
+            self._file.write(HEADER.pack(MAGIC, LOG_VERSION, 0, self.started))
+            self._file.flush()
+        # Relógio monotônico alinhado ao início do log
+        self._origin = time.monotonic() - (time.time() - self.started)
+
+    def attach(self, controller):
+        """Starts recording a controller's traffic"""
+        controller.add_tap(self.record)
+        self._controllers.append(controller)
+        return self
+
+    def detach(self, controller):
+        controller.remove_tap(self.record)
+        self._controllers.remove(controller)
+
+    def record(self, commands, result):
+        """Appends one request (called by the controller after each send)"""
+        ok = result is not None and result.get("error_code", 0) == 0
+        elapsed = time.monotonic() - self._origin
+        chunks = []
+        for index, command in enumerate(commands):
+            stripped, payload = _split_payload(command)
+            body = json.dumps(stripped, separators=(",", ":")).encode("utf-8")
+            flags = (FLAG_OK if ok else 0) | (FLAG_BATCHED if index else 0) | (FLAG_PAYLOAD if payload else 0)
+            chunks += [RECORD.pack(elapsed, flags, len(body), len(payload)), body, payload]
+
+        data = b"".join(chunks)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            self.records += len(commands)
+            self.bytes_written += len(data)
+
+    def close(self):
+        for controller in list(self._controllers):
+            self.detach(controller)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CommandLog:
+    def __init__(self, path):
+        """
+        Read-only view of a command log, memory-mapped
+
+        Records are parsed lazily while iterating; frame payloads are
+        slices of the mapping until a command is rebuilt.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a PIXOO command log")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.started = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != LOG_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a PIXOO command log")
+
+    def raw_records(self):
+        """Yields (time, flags, command without PicData, payload memoryview valid until the next record)"""
+        view = memoryview(self._map)
+        offset = HEADER.size
+        end = len(view)
+        try:
+            while offset + RECORD.size <= end:
+                elapsed, flags, json_len, payload_len = RECORD.unpack_from(view, offset)
+                offset += RECORD.size
+                if offset + json_len + payload_len > end:
+                    break  # Registro incompleto (gravação interrompida)
+                command = json.loads(bytes(view[offset:offset + json_len]))
+                offset += json_len
+                payload = view[offset:offset + payload_len]
+                offset += payload_len
+                yield elapsed, flags, command, payload
+                payload.release()
+        finally:
+            view.release()
+
+    def __iter__(self):
+        """Yields Record(time, command, ok, batched) with PicData rebuilt"""
+        for elapsed, flags, command, payload in self.raw_records():
+            if flags & FLAG_PAYLOAD:
+                command["PicData"] = base64.b64encode(payload).decode("ascii")
+            yield Record(elapsed, command, bool(flags & FLAG_OK), bool(flags & FLAG_BATCHED))
+
+    def requests(self, only_ok=False):
+        """Yields (time, [commands]) grouped as they were originally sent"""
+        batch, batch_time, batch_ok = [], 0.0, True
+        for record in self:
+            if not record.batched and batch:
+                if batch_ok or not only_ok:
+                    yield batch_time, batch
+                batch = []
+            if not record.batched:
+                batch_time, batch_ok = record.time, record.ok
+            batch.append(record.command)
+        if batch and (batch_ok or not only_ok):
+            yield batch_time, batch
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def replay(path, target, speed=1.0, only_ok=True, stop_event=None):
+    """
+    Sends a recorded log to a controller (or any object with send_commands)
+
+    Args:
+        path: command log written by CommandRecorder
+        target: PixooController, VirtualPixoo, ...
+        speed: timing multiplier (2.0 = twice as fast; 0 or None = no waiting)
+        only_ok: skip requests the original device rejected
+        stop_event: threading.Event that aborts the replay
+
+    Returns the number of requests replayed.
+    """
+    sent = 0
+    start = time.monotonic()
+    with CommandLog(path) as log:
+        first = None
+        for elapsed, commands in log.requests(only_ok=only_ok):
+            if first is None:
+                first = elapsed
+            if speed:
+                delay = start + (elapsed - first) / speed - time.monotonic()
+                if delay > 0:
+                    if stop_event is not None:
+                        if stop_event.wait(delay):
+                            break
+                    else:
+                        time.sleep(delay)
+            if stop_event is not None and stop_event.is_set():
+                break
+            target.send_commands(commands, dedupe=False)
+            sent += 1
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay or inspect a PIXOO command log")
+    parser.add_argument("log", help="command log written by CommandRecorder")
+    parser.add_argument("--ip", help="replay to this device")
+    parser.add_argument("--port", type=int, default=80)
+    parser.add_argument("--speed", type=float, default=1.0, help="timing multiplier (0 = as fast as possible)")
+    parser.add_argument("--png", help="replay into the emulator and save the final screen")
+    parser.add_argument("--gif", help="replay into the emulator and save the current animation")
+    args = parser.parse_args()
+
+    if args.ip:
+        from pixoo_controller import PixooController
+        pixoo = PixooController(args.ip, port=args.port, verbose=False)
+        try:
+            sent = replay(args.log, pixoo, speed=args.speed)
+        finally:
+            pixoo.close()
+        print(f"📼 Replayed {sent} requests to {args.ip}")
+    elif args.png or args.gif:
+        from pixoo_emulator import VirtualPixoo
+        device = VirtualPixoo()
+        sent = replay(args.log, device, speed=args.speed)
+        if args.png:
+            device.save_png(args.png)
+        if args.gif:
+            device.save_gif(args.gif)
+        print(f"📼 Replayed {sent} requests into the emulator")
+    else:
+        with CommandLog(args.log) as log:
+            for record in log:
+                name = record.command.get("Command")
+                print(f"{record.time:10.3f}s {'  ' if record.batched else ''}{name} "
+                      f"{'' if record.ok else '(failed)'}")
+
+
+if __name__ == "__main__":
+    main()
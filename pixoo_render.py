@@ -0,0 +1,350 @@
+"""
+DIVOOM PIXOO 64x64 frame rendering
+Vectorized (NumPy) generators for the built-in patterns and animations,
+drawn straight into Canvas framebuffers
+"""
+
+import base64
+import functools
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Coordinate grids (Y = row, X = column) are shared with the animation plugins
+from pixoo_animations import ANIMATIONS, COLUMNS, ROWS, X, Y, animation_class
+from pixoo_canvas import FRAME_BYTES, FRAME_SHAPE, HEIGHT, WIDTH, Canvas
+
+
+def new_frame():
+    """Creates a black 64x64 Canvas"""
+    return Canvas()
+
+
+def _target(canvas):
+    """Returns a cleared canvas to render into (reusing the given one)"""
+    if canvas is None:
+        return Canvas()
+    return canvas.clear()
+
+
+def encode_frame(frame):
+    """Encodes a Canvas or 64x64x3 uint8 array as the base64 PicData string"""
+    if isinstance(frame, Canvas):
+        return frame.to_pic_data()
+    frame = np.ascontiguousarray(frame, dtype=np.uint8)
+    return base64.b64encode(frame.data).decode('ascii')
+
+
+def to_pic_data(frame):
+    """Converts a frame (Canvas, PicData string, raw RGB bytes or uint8 array) to PicData"""
+    if isinstance(frame, str):
+        return frame
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        return base64.b64encode(frame).decode('ascii')
+    return encode_frame(frame)
+
+
+# ---------------------------------------------------------------------------
+# Static patterns
+# ---------------------------------------------------------------------------
+
+def _pattern_gradient(frame):
+    frame[..., 0] = np.minimum(255, X * 4)
+    frame[..., 1] = np.minimum(255, Y * 4)
+    frame[..., 2] = 128
+
+
+def _pattern_checkerboard(frame):
+    frame[(X + Y) % 2 == 0] = (255, 255, 255)
+
+
+def _pattern_border(frame):
+    frame[0, :] = frame[-1, :] = (0, 255, 255)
+    frame[:, 0] = frame[:, -1] = (0, 255, 255)
+
+
+def _pattern_test(frame):
+    frame[..., 0] = X * 4
+    frame[..., 1] = Y * 4
+    frame[..., 2] = 64
+
+
+PATTERNS = {
+    "gradient": _pattern_gradient,
+    "checkerboard": _pattern_checkerboard,
+    "border": _pattern_border,
+    "test": _pattern_test,
+}
+
+
+def render_pattern(pattern, canvas=None):
+    """Renders a static pattern into a Canvas (unknown patterns stay black)"""
+    canvas = _target(canvas)
+    renderer = PATTERNS.get(pattern)
+    if renderer is not None:
+        renderer(canvas.array)
+    return canvas
+
+
+# ---------------------------------------------------------------------------
+# QR codes
+# ---------------------------------------------------------------------------
+
+def qr_level(error_correction=None):
+    """Resolved qrcode.constants error correction level (ERROR_CORRECT_L if None)"""
+    from qrcode.constants import ERROR_CORRECT_L
+
+    return ERROR_CORRECT_L if error_correction is None else error_correction
+
+
+def qr_modules(data, error_correction=None):
+    """
+    Module matrix of the smallest QR code holding data, without quiet zone
+
+    Returns (modules, version): an NxN boolean array (True = dark module)
+    and the QR version. error_correction is a qrcode.constants value
+    (ERROR_CORRECT_L if None). Raises qrcode's DataOverflowError when the
+    data does not fit any version.
+    """
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=None,   # Menor versão que comporta os dados
+        error_correction=qr_level(error_correction),
+        box_size=1,
+        border=0,       # Sem quiet zone: o máximo de tela para os módulos
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool), qr.version
+
+
+def qr_layout(modules_count):
+    """Largest integer module scale, final size and centering offset for an NxN code"""
+    scale = min(WIDTH, HEIGHT) // modules_count
+    size = modules_count * scale
+    return scale, size, (min(WIDTH, HEIGHT) - size) // 2
+
+
+def draw_qr(canvas, modules, color=(255, 255, 255)):
+    """
+    Draws a module matrix centered at the largest integer scale
+
+    Each module becomes a scale x scale block written through a reshaped
+    view of the framebuffer (no per-pixel work, no intermediate image).
+    Raises ValueError if the code has more modules than the screen has pixels.
+    """
+    count = len(modules)
+    if count > min(WIDTH, HEIGHT):
+        raise ValueError(f"QR code has {count}x{count} modules, the screen fits 64x64")
+    scale, size, offset = qr_layout(count)
+    blocks = canvas.array[offset:offset + size, offset:offset + size].reshape(count, scale, count, scale, 3)
+    blocks[...] = np.where(modules[:, np.newaxis, :, np.newaxis, np.newaxis],
+                           np.asarray(color, dtype=np.uint8), blocks)
+    return canvas
+
+
+def render_qr(data, error_correction=None, canvas=None):
+    """Renders data as a white-on-black QR code filling as much of the screen as possible"""
+    return draw_qr(_target(canvas), qr_modules(data, error_correction)[0])
+
+
+# ---------------------------------------------------------------------------
+# Animations (plugins registered in pixoo_animations)
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=32)
+def _shared_animation(cls, total_frames):
+    # Instâncias compartilhadas: draw() não altera o estado, e as tabelas são calculadas uma vez
+    return cls(total_frames)
+
+
+def render_animation_frame(animation_type, frame_num, total_frames, canvas=None):
+    """Renders one animation frame into a Canvas (animation_type: registered name or Animation class)"""
+    cls = animation_type if isinstance(animation_type, type) else animation_class(animation_type)
+    return _shared_animation(cls, total_frames).render(frame_num, canvas)
+
+
+def animation_frames(animation_type, total_frames, loop=False):
+    """Yields an animation's frames in order, each derived from the previous one"""
+    return animation_class(animation_type)(total_frames).frames(loop)
+
+
+def loop_animation(animation_type, total_frames=60):
+    """Endless generator cycling through an animation (for live streaming)"""
+    return animation_frames(animation_type, total_frames, loop=True)
+
+
+# ---------------------------------------------------------------------------
+# Pipelining
+# ---------------------------------------------------------------------------
+
+_END = object()
+
+
+class prefetch:
+    """
+    Produces frames ahead on a worker thread while the caller consumes them
+
+    Args:
+        frames: iterable of frames (consumed on the worker thread)
+        depth: maximum number of frames rendered ahead (bounded queue)
+
+    Iterating yields the frames in their original order. The worker starts
+    immediately, exceptions raised by the source are re-raised in the
+    consumer, and close() stops the worker.
+    """
+
+    def __init__(self, frames, depth=4):
+        self._buffer = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._done = False
+        self._thread = threading.Thread(target=self._worker, args=(frames,),
+                                        name="pixoo-prefetch", daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        # Bloqueia enquanto a fila está cheia, mas desiste se o consumidor parou
+        while not self._stop.is_set():
+            try:
+                self._buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(self, frames):
+        try:
+            for frame in frames:
+                if not self._put((frame, None)):
+                    return
+        except Exception as e:
+            self._put((_END, e))
+            return
+        self._put((_END, None))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        frame, error = self._buffer.get()
+        if frame is _END:
+            self.close()
+            if error is not None:
+                raise error
+            raise StopIteration
+        return frame
+
+    def close(self):
+        """Stops the worker and discards frames rendered ahead"""
+        self._done = True
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Parallel rendering (process pool)
+# ---------------------------------------------------------------------------
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def render_pool(workers=None):
+    """
+    Shared process pool for frame rendering, created on first use
+
+    Args:
+        workers: number of processes (one per core if None or 0)
+    """
+    global _pool, _pool_workers
+    workers = workers or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_render_pool():
+    """Stops the shared render processes"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, 0
+
+
+def _render_pic_data(cls, frame_num, total_frames):
+    # Executado num processo do pool: renderiza e já devolve o PicData codificado.
+    # Recebe a classe (importada pelo módulo no processo), não o nome: o registro
+    # do processo pode não ter plugins registrados depois da criação do pool ou sob spawn
+    return render_animation_frame(cls, frame_num, total_frames).to_pic_data()
+
+
+class render_parallel:
+    """
+    Renders animation frames across a process pool, yielding PicData in order
+
+    Args:
+        animation_type: name in ANIMATIONS
+        total_frames: frames in the animation
+        frames: frame numbers to render (all of them if None)
+        workers: pool size (one process per core if None)
+
+    Every frame is submitted immediately; iterating yields frame 0 as soon
+    as it is ready while later frames are still rendering. close() cancels
+    the frames not yet started.
+    """
+
+    def __init__(self, animation_type, total_frames, frames=None, workers=None):
+        if frames is None:
+            frames = range(total_frames)
+        cls = animation_class(animation_type)
+        pool = render_pool(workers)
+        self._futures = [pool.submit(_render_pic_data, cls, frame_num, total_frames)
+                         for frame_num in frames]
+        self._next = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._next >= len(self._futures):
+            raise StopIteration
+        future = self._futures[self._next]
+        self._next += 1
+        try:
+            return future.result()
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self._futures)
+
+    def close(self):
+        """Cancels the frames that have not started rendering"""
+        for future in self._futures[self._next:]:
+            future.cancel()
+        self._next = len(self._futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
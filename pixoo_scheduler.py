@@ -0,0 +1,319 @@
+"""
+DIVOOM PIXOO 64x64 command scheduler
+Serializes concurrent callers through one worker and coalesces superseded commands
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+# Prioridades: menor número sai primeiro
+HIGH = 0
+NORMAL = 10
+LOW = 20
+
+
+def coalesce_key(commands):
+    """
+    Key under which a newer submission replaces a pending one, or None
+
+    Only the latest text per TextId and the latest full static frame
+    matter; anything else (animation frames, resets, batches) is kept.
+    """
+    if len(commands) != 1:
+        return None
+    command = commands[0]
+    name = command.get("Command")
+    if name == "Draw/SendHttpText":
+        return ("text", command.get("TextId", 1))
+    if name == "Draw/SendHttpGif" and command.get("PicNum", 1) == 1:
+        return "display"
+    return None
+
+
+def _is_static_frame(command):
+    return command.get("Command") == "Draw/SendHttpGif" and command.get("PicNum", 1) == 1
+
+
+class _Entry:
+    __slots__ = ("priority", "seq", "commands", "dedupe", "call", "key", "futures", "superseded")
+
+    def __init__(self, priority, seq, commands=None, dedupe=True, call=None, key=None):
+        self.priority = priority
+        self.seq = seq
+        self.commands = commands
+        self.dedupe = dedupe
+        self.call = call
+        self.key = key
+        self.futures = [Future()]
+        self.superseded = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class CommandScheduler:
+    def __init__(self, controller, max_batch=8, min_interval=0.0):
+        """
+        Background queue that owns the controller's connection
+
+        Producers on any thread submit commands and get a Future with the
+        device reply. One worker drains the queue in priority order (FIFO
+        within a priority), packing consecutive submissions into a single
+        Draw/CommandList request. A pending text for the same TextId or a
+        pending full frame is replaced by a newer one; every superseded
+        Future resolves with the reply of the command that replaced it.
+
+        With min_interval, requests start at least that many seconds apart
+        however many producers there are, including the requests made
+        inside a call(); whatever arrives meanwhile is coalesced and packed
+        into the next request.
+
+        Args:
+            controller: PixooController whose send_commands() is used
+            max_batch: most commands packed into one request
+            min_interval: minimum seconds between the starts of two requests
+        """
+        self.controller = controller
+        self.max_batch = max_batch
+        self.min_interval = min_interval
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.requests = 0
+        self.commands_sent = 0
+        self.throttled = 0
+
+        self._heap = []
+        self._pending = {}           # coalesce key -> _Entry ainda na fila
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._last_start = None
+        self._worker = threading.Thread(target=self._run, name="pixoo-scheduler", daemon=True)
+        self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def submit(self, commands, priority=NORMAL, dedupe=True):
+        """
+        Queues commands and returns a Future resolving to the device reply
+
+        Static frames without a PicID get the next free GIF ID when sent.
+        """
+        commands = list(commands)
+        key = coalesce_key(commands)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            entry = _Entry(priority, next(self._seq), commands=commands, dedupe=dedupe, key=key)
+            self._supersede(entry)
+            self.submitted += 1
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+        return entry.futures[0]
+
+    def call(self, function, *args, priority=NORMAL, coalesce=None, **kwargs):
+        """
+        Runs a multi-request operation (e.g. upload_frames) on the worker
+
+        Nothing else reaches the device until it returns, so its requests
+        are never interleaved with other producers. With coalesce (e.g.
+        "display"), a pending submission or call under the same key is
+        replaced by this one, and vice versa.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            entry = _Entry(priority, next(self._seq), call=lambda: function(*args, **kwargs), key=coalesce)
+            self._supersede(entry)
+            self.submitted += 1
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+        return entry.futures[0]
+
+    def _supersede(self, entry):
+        # Chamado com o lock adquirido
+        if entry.key is None:
+            return
+        old = self._pending.get(entry.key)
+        if old is not None:
+            # Comando mais novo substitui o pendente; quem esperava recebe a nova resposta
+            old.superseded = True
+            entry.futures.extend(old.futures)
+            entry.priority = min(entry.priority, old.priority)
+            self.coalesced += 1
+        self._pending[entry.key] = entry
+
+    def in_worker(self):
+        """True when called from the scheduler's own worker thread"""
+        return threading.current_thread() is self._worker
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _pop(self):
+        # Chamado com o lock adquirido
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry.superseded:
+                continue
+            if entry.key is not None and self._pending.get(entry.key) is entry:
+                del self._pending[entry.key]
+            return entry
+        return None
+
+    def _peek(self):
+        # Chamado com o lock adquirido
+        while self._heap and self._heap[0].superseded:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _throttle(self):
+        # Espera o intervalo mínimo; o que chegar nesse meio-tempo é agrupado
+        if not self.min_interval or self._last_start is None:
+            return
+        deadline = self._last_start + self.min_interval
+        with self._cond:
+            if time.monotonic() < deadline and not self._closed:
+                self.throttled += 1
+            while not self._closed:
+                delay = deadline - time.monotonic()
+                if delay <= 0:
+                    break
+                self._cond.wait(delay)
+
+    def pace(self):
+        """
+        Waits until min_interval has passed since the previous request (worker only)
+
+        The controller calls it just before each request it sends from the
+        worker, so the interval also holds between the requests of a call()
+        such as an animation upload.
+        """
+        self._throttle()
+        self._last_start = time.monotonic()
+
+    def _next_batch(self):
+        """Blocks for the next entry and packs as many queued commands as fit in one request"""
+        with self._cond:
+            while not self._heap and not self._closed:
+                self._cond.wait()
+            first = self._pop()
+            if first is None or first.call is not None:
+                return [first] if first else []
+
+            batch = [first]
+            size = len(first.commands)
+            has_frame = any(_is_static_frame(command) for command in first.commands)
+            while True:
+                entry = self._peek()
+                if entry is None or entry.call is not None or size + len(entry.commands) > self.max_batch:
+                    break
+                frame = any(_is_static_frame(command) for command in entry.commands)
+                if frame and has_frame:
+                    break  # Um frame de 12 KB por requisição
+                batch.append(self._pop())
+                size += len(entry.commands)
+                has_frame = has_frame or frame
+            return batch
+
+    def _assign_pic_ids(self, commands):
+        # PicID dos frames estáticos é alocado só agora, na ordem real de envio
+        state = self.controller.state
+        pic_id = state.next_pic_id()
+        result = []
+        for command in commands:
+            name = command.get("Command")
+            if name == "Draw/ResetHttpGifId":
+                pic_id = 1
+            elif _is_static_frame(command) and "PicID" not in command:
+                if pic_id is None:
+                    result.append({"Command": "Draw/ResetHttpGifId"})
+                    pic_id = 1
+                command = dict(command, PicID=pic_id)
+                pic_id += 1
+            result.append(command)
+        return result
+
+    def _send(self, batch):
+        changes = self.controller.changes
+        commands = []
+        for entry in batch:
+            if entry.dedupe and changes is not None:
+                commands.extend(changes.filter(entry.commands))
+            else:
+                commands.extend(entry.commands)
+        if not commands:
+            return {"error_code": 0, "skipped": True}
+
+        commands = self._assign_pic_ids(commands)
+        self.requests += 1
+        self.commands_sent += len(commands)
+        return self.controller.send_commands(commands, dedupe=False)
+
+    def _run(self):
+        while True:
+            self._throttle()
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                if batch[0].call is not None:
+                    result = batch[0].call()
+                else:
+                    result = self._send(batch)
+            except Exception as e:
+                for entry in batch:
+                    for future in entry.futures:
+                        future.set_exception(e)
+                continue
+            for entry in batch:
+                for future in entry.futures:
+                    future.set_result(result)
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    def pending(self):
+        """Number of submissions waiting to be sent"""
+        with self._cond:
+            return sum(1 for entry in self._heap if not entry.superseded)
+
+    def close(self, wait=True):
+        """Stops accepting work; pending commands are still sent when wait is True"""
+        with self._cond:
+            self._closed = True
+            if not wait:
+                for entry in self._heap:
+                    if not entry.superseded:
+                        for future in entry.futures:
+                            future.cancel()
+                self._heap.clear()
+                self._pending.clear()
+            self._cond.notify_all()
+        if not self.in_worker():
+            self._worker.join()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "requests": self.requests,
+                "commands_sent": self.commands_sent,
+                "throttled": self.throttled,
+                "pending": sum(1 for entry in self._heap if not entry.superseded),
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,102 @@
+"""
+DIVOOM PIXOO 64x64 device state
+Model of what the device currently holds, used to elide redundant commands
+"""
+
+import threading
+
+from pixoo_changes import fingerprint
+
+# Channel index of the custom/HTTP drawing channel
+CUSTOM_CHANNEL = 4
+
+
+class DeviceState:
+    def __init__(self, pic_id_limit=32):
+        """
+        Known device state, updated only from commands the device accepted
+
+        None means "unknown": right after start-up and after any failed
+        command, so the next reset_device() resynchronizes everything.
+
+        Args:
+            pic_id_limit: GIF IDs used before the counter is reset again
+        """
+        self.pic_id_limit = pic_id_limit
+        self._lock = threading.Lock()
+        self.invalidate()
+
+    def invalidate(self):
+        """Forgets everything; the next reset will resend every command"""
+        with self._lock:
+            self.channel = None   # Canal atual
+            self.gif_id = None    # Último PicID aceito desde o reset
+            self.texts = None     # {TextId: texto} ativos
+            self.frame = None     # Impressão digital do último frame estático exibido
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def apply(self, commands):
+        """Updates the model with commands the device accepted"""
+        with self._lock:
+            for command in commands:
+                name = command.get("Command")
+                if name == "Draw/ResetHttpGifId":
+                    self.gif_id = 0
+                elif name == "Draw/SendHttpGif":
+                    pic_id = command.get("PicID", 0)
+                    self.gif_id = pic_id if self.gif_id is None else max(self.gif_id, pic_id)
+                    if command.get("PicNum", 1) == 1:
+                        self.frame = fingerprint(command.get("PicData", ""))
+                    else:
+                        self.frame = None  # Animação: não é um frame estático
+                elif name == "Draw/SendHttpText":
+                    if self.texts is not None:
+                        self.texts[command.get("TextId", 1)] = command.get("TextString", "")
+                elif name == "Draw/ClearHttpText":
+                    self.texts = {}
+                elif name == "Channel/SetIndex":
+                    self.channel = command.get("SelectIndex")
+
+    def sync(self, channel=None, gif_id=None):
+        """Stores values read back from the device"""
+        with self._lock:
+            if channel is not None:
+                self.channel = channel
+            if gif_id is not None:
+                self.gif_id = gif_id
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def next_pic_id(self, limit=None):
+        """Next free GIF ID, or None if the counter is unknown or exhausted (reset needed)"""
+        limit = self.pic_id_limit if limit is None else limit
+        with self._lock:
+            if self.gif_id is None or self.gif_id + 1 > limit:
+                return None
+            return self.gif_id + 1
+
+    def reset_commands(self):
+        """Subset of the reset sequence that would actually change the device"""
+        with self._lock:
+            commands = []
+            if self.gif_id is None or self.gif_id >= self.pic_id_limit:
+                commands.append({"Command": "Draw/ResetHttpGifId"})
+            if self.texts is None or self.texts:
+                commands.append({"Command": "Draw/ClearHttpText"})
+            if self.channel != CUSTOM_CHANNEL:
+                commands.append({"Command": "Channel/SetIndex", "SelectIndex": CUSTOM_CHANNEL})
+            return commands
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "channel": self.channel,
+                "gif_id": self.gif_id,
+                "texts": dict(self.texts) if self.texts is not None else None,
+                "frame": self.frame,
+            }
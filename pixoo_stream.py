@@ -0,0 +1,225 @@
+"""
+DIVOOM PIXOO 64x64 live streaming
+Pushes single frames at a target FPS, without the 40-frame GIF limit
+"""
+
+import threading
+import time
+from collections import deque
+
+from pixoo_render import to_pic_data
+
+
+class FramePacer:
+    def __init__(self, fps):
+        """
+        Monotonic frame clock that ticks at a fixed rate without drift
+
+        Deadlines are computed from the start time, so a late tick does not
+        push every later tick back. When more than one interval behind, the
+        missed ticks are skipped instead of bursting to catch up.
+        """
+        self.interval = 1.0 / fps
+        self.next_tick = None
+        self.skipped = 0
+
+    def set_fps(self, fps):
+        self.interval = 1.0 / fps
+
+    def wait(self, stop_event=None):
+        """Waits for the next tick; returns False if stop_event was set meanwhile"""
+        now = time.monotonic()
+        if self.next_tick is None:
+            self.next_tick = now
+
+        delay = self.next_tick - now
+        if delay > 0:
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+        elif -delay > self.interval:
+            missed = int(-delay / self.interval)
+            self.skipped += missed
+            self.next_tick += missed * self.interval
+
+        self.next_tick += self.interval
+        return stop_event is None or not stop_event.is_set()
+
+
+class FrameStreamer:
+    def __init__(self, controller, frames, fps=None, buffer_size=2, reset_interval=32):
+        """
+        Streams frames from a (possibly endless) generator to the PIXOO
+
+        Args:
+            controller: PixooController used to send the frames
+            frames: iterable of frames (uint8 arrays, raw RGB bytes or PicData)
+            fps: target frames per second (uses controller.current_fps if None)
+            buffer_size: frames kept waiting for the device; the oldest is dropped when full
+            reset_interval: frames sent before the GIF ID counter is reset
+        """
+        self.controller = controller
+        self.frames = iter(frames)
+        self.fps = fps or controller.current_fps
+        self.reset_interval = reset_interval
+
+        self.sent = 0
+        self.unchanged = 0      # Frames iguais ao da tela, descartados pela deduplicação
+        self.dropped = 0
+        self.errors = 0
+
+        self._pacer = FramePacer(self.fps)
+        self._buffer = deque(maxlen=max(1, buffer_size))
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._exhausted = False
+        self._started_at = None
+        self._send_times = deque(maxlen=max(2, int(self.fps * 2)))
+        self._threads = []
+
+    def set_fps(self, fps):
+        """Changes the target rate while streaming"""
+        self.fps = fps
+        self._pacer.set_fps(fps)
+
+    # ------------------------------------------------------------------
+    # Producer: pulls one frame per tick from the generator
+    # ------------------------------------------------------------------
+
+    def _produce(self):
+        try:
+            while self._pacer.wait(self._stop):
+                try:
+                    frame = next(self.frames)
+                except StopIteration:
+                    break
+                with self._cond:
+                    # Dispositivo atrasado: descarta o frame mais antigo
+                    if len(self._buffer) == self._buffer.maxlen:
+                        self.dropped += 1
+                    self._buffer.append(frame)
+                    self._cond.notify()
+        finally:
+            with self._cond:
+                self._exhausted = True
+                self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Sender: pushes the buffered frames as fast as the device replies
+    # ------------------------------------------------------------------
+
+    def _send_loop(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._exhausted and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set() or not self._buffer:
+                    return
+                frame = self._buffer.popleft()
+            self._send(frame)
+
+    def _send(self, frame):
+        commands = []
+        pic_id = self.controller.state.next_pic_id(limit=self.reset_interval)
+        if pic_id is None:
+            # O contador de GIF precisa ser reiniciado periodicamente
+            commands.append({"Command": "Draw/ResetHttpGifId"})
+            pic_id = 1
+
+        gif_command = {
+            "Command": "Draw/SendHttpGif",
+            "PicNum": 1,
+            "PicWidth": 64,
+            "PicOffset": 0,
+            "PicID": pic_id,
+            "PicSpeed": 1000,
+            "PicData": to_pic_data(frame)
+        }
+        # Frame igual ao da tela: só conta como enviado se o próprio SendHttpGif sair
+        changes = self.controller.changes
+        changed = changes is None or not changes.is_redundant(gif_command)
+        if changed:
+            commands.append(gif_command)
+
+        if commands:
+            # Em caso de falha o estado do controlador é invalidado e o próximo frame reinicia o contador
+            result = self.controller.send_commands(commands)
+            if result is None:
+                self.errors += 1
+                return False
+        if not changed:
+            self.unchanged += 1
+            return True
+
+        self.sent += 1
+        self._send_times.append(time.monotonic())
+        return True
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Starts streaming in background threads"""
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._produce, name="pixoo-stream-producer", daemon=True),
+            threading.Thread(target=self._send_loop, name="pixoo-stream-sender", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stops streaming and waits for the threads to finish"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def run(self, duration=None):
+        """
+        Streams in the foreground until the generator ends, duration elapses or Ctrl+C
+
+        Returns the final stats() dictionary.
+        """
+        self.start()
+        try:
+            deadline = None if duration is None else time.monotonic() + duration
+            while self.is_running():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._threads[-1].join(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        return self.stats()
+
+    def achieved_fps(self):
+        """Frames per second actually delivered over the recent window"""
+        times = list(self._send_times)
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def stats(self):
+        """Returns delivery counters and the measured frame rate"""
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "target_fps": self.fps,
+            "achieved_fps": round(self.achieved_fps(), 2),
+            "average_fps": round(self.sent / elapsed, 2) if elapsed else 0.0,
+            "sent": self.sent,
+            "unchanged": self.unchanged,
+            "dropped": self.dropped,
+            "skipped_ticks": self._pacer.skipped,
+            "errors": self.errors,
+        }
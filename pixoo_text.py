@@ -0,0 +1,176 @@
+"""
+DIVOOM PIXOO 64x64 text rendering
+Rasterizes strings locally from cached glyph atlases, independent of the device fonts
+"""
+
+import threading
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from pixoo_canvas import HEIGHT, WIDTH, Canvas
+
+# Alinhamentos aceitos por Draw/SendHttpText (1 = esquerda, 2 = centro, 3 = direita)
+ALIGN_LEFT = 1
+ALIGN_CENTER = 2
+ALIGN_RIGHT = 3
+
+
+def parse_color(color):
+    """Converts "#RRGGBB" (or an (r, g, b) tuple) to an RGB tuple"""
+    if isinstance(color, str):
+        value = color.lstrip("#")
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(color)
+
+
+class GlyphAtlas:
+    def __init__(self, font=None, size=8):
+        """
+        Rasterized glyphs of one font at one size
+
+        Each glyph is drawn once into a coverage mask (uint8, line height x
+        advance) and reused for every string afterwards.
+
+        Args:
+            font: TrueType/OpenType font path (Pillow's built-in font if None)
+            size: font size in pixels
+        """
+        self.font = ImageFont.load_default(size=size) if font is None else ImageFont.truetype(font, size)
+        self.size = size
+        ascent, descent = self.font.getmetrics()
+        self.height = ascent + descent
+        self._glyphs = {}
+        self._lock = threading.Lock()
+
+    def glyph(self, char):
+        """Coverage mask of one character (rendered on first use)"""
+        mask = self._glyphs.get(char)
+        if mask is None:
+            width = max(1, int(round(self.font.getlength(char))))
+            image = Image.new("L", (width, self.height), 0)
+            ImageDraw.Draw(image).text((0, 0), char, fill=255, font=self.font)
+            mask = np.asarray(image)
+            with self._lock:
+                mask = self._glyphs.setdefault(char, mask)
+        return mask
+
+    def mask(self, text):
+        """Coverage mask of a whole string (line height x text width)"""
+        if not text:
+            return np.zeros((self.height, 0), dtype=np.uint8)
+        return np.concatenate([self.glyph(char) for char in text], axis=1)
+
+    def width(self, text):
+        return sum(self.glyph(char).shape[1] for char in text)
+
+    def __len__(self):
+        return len(self._glyphs)
+
+
+_atlases = {}
+_atlases_lock = threading.Lock()
+
+
+def get_atlas(font=None, size=8):
+    """Shared GlyphAtlas for a font and size (one per combination)"""
+    key = (font, size)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        with _atlases_lock:
+            atlas = _atlases.get(key)
+            if atlas is None:
+                atlas = _atlases[key] = GlyphAtlas(font, size)
+    return atlas
+
+
+def blend(region, color, coverage):
+    """Paints color over an HxWx3 region in place, weighted by a uint8 coverage mask"""
+    alpha = coverage.astype(np.uint16)[..., None]
+    color = np.asarray(color, dtype=np.uint16)
+    region[...] = (color * alpha + region.astype(np.uint16) * (255 - alpha) + 127) // 255
+
+
+def _paste_mask(canvas, mask, x, y, color):
+    # Recorta a máscara à tela antes de misturar
+    h, w = mask.shape
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(WIDTH, x + w), min(HEIGHT, y + h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    blend(canvas.array[y0:y1, x0:x1], color, mask[y0 - y:y1 - y, x0 - x:x1 - x])
+
+
+def draw_text(canvas, text, x=0, y=0, color="#FFFFFF", font=None, size=8, align=ALIGN_LEFT):
+    """
+    Draws a single line of text onto a Canvas (anti-aliased, clipped)
+
+    With ALIGN_CENTER/ALIGN_RIGHT the line is placed inside the screen
+    width, offset by x.
+    """
+    atlas = get_atlas(font, size)
+    mask = atlas.mask(text)
+    if align == ALIGN_CENTER:
+        x += (WIDTH - mask.shape[1]) // 2
+    elif align == ALIGN_RIGHT:
+        x += WIDTH - mask.shape[1]
+    _paste_mask(canvas, mask, x, y, parse_color(color))
+    return canvas
+
+
+def render_text(text, x=0, y=0, color="#FFFFFF", font=None, size=8, align=ALIGN_LEFT, background=None):
+    """Renders text into a new Canvas, over a copy of background if given"""
+    canvas = Canvas() if background is None else _background(background).copy()
+    return draw_text(canvas, text, x, y, color, font, size, align)
+
+
+def _background(background):
+    if isinstance(background, Canvas):
+        return background
+    return Canvas.from_array(np.asarray(background, dtype=np.uint8))
+
+
+def marquee_frames(text, y=0, color="#FFFFFF", font=None, size=8, step=1, background=None, loop=False):
+    """
+    Yields the frames of text scrolling right to left across the screen
+
+    Only the text band is touched per frame: the previous band's coverage
+    is shifted left by step pixels and just the newly exposed columns are
+    copied in from the string mask, then the band is composited over the
+    background (a Canvas or 64x64x3 array; black if None).
+
+    Args:
+        text: string to scroll
+        y: top row of the text band
+        step: pixels scrolled per frame
+        loop: start over when the text has left the screen (endless generator)
+    """
+    atlas = get_atlas(font, size)
+    color = parse_color(color)
+    step = max(1, min(step, WIDTH))
+    strip = atlas.mask(text)
+    height = atlas.height
+    # Texto entra pela direita e sai completamente pela esquerda
+    total = strip.shape[1] + WIDTH
+    padded = np.zeros((height, total + WIDTH + step), dtype=np.uint8)
+    padded[:, WIDTH:WIDTH + strip.shape[1]] = strip
+
+    base = _background(background) if background is not None else Canvas()
+    y0, y1 = max(0, y), min(HEIGHT, y + height)
+    band = padded[y0 - y:y1 - y]
+
+    while True:
+        window = band[:, :WIDTH].copy()   # Cobertura visível do frame atual
+        offset = 0
+        while offset < total:
+            frame = base.copy()
+            if y0 < y1:
+                blend(frame.array[y0:y1], color, window)
+            yield frame
+
+            # Próximo frame: desloca o anterior e preenche só as colunas novas
+            window[:, :WIDTH - step] = window[:, step:]
+            window[:, WIDTH - step:] = band[:, offset + WIDTH:offset + WIDTH + step]
+            offset += step
+        if not loop:
+            return
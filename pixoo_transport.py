@@ -0,0 +1,120 @@
+"""
+DIVOOM PIXOO 64x64 HTTP transport
+Keep-alive connection pool and batched command lists for the /post endpoint
+"""
+
+import json
+import socket
+from urllib.parse import urlsplit
+
+# Firmware endpoint that executes several commands in one HTTP request
+COMMAND_LIST = "Draw/CommandList"
+
+
+class PixooTransport:
+    def __init__(self, base_url, pool_size=4, timeout=5, connect_timeout=None, max_retries=0):
+        """
+        Persistent HTTP transport for one PIXOO device
+
+        Args:
+            base_url: device endpoint, e.g. "http://10.0.2.214:80/post"
+            pool_size: number of keep-alive connections kept open
+            timeout: read timeout in seconds
+            connect_timeout: TCP connect timeout in seconds (uses timeout if None)
+            max_retries: automatic retries on connection errors
+        """
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout if connect_timeout is None else (connect_timeout, timeout)
+
+        # requests só é importado aqui: LightTransport não precisa dele
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,       # Only one host per transport
+            pool_maxsize=pool_size,
+            max_retries=max_retries,
+            pool_block=True,          # Never open more sockets than the device can handle
+        )
+        self.session.mount("http://", adapter)
+
+    @staticmethod
+    def encode(commands):
+        """Serializes one command, or several wrapped in Draw/CommandList, to the request body"""
+        commands = list(commands)
+        payload = commands[0] if len(commands) == 1 else {"Command": COMMAND_LIST, "CommandList": commands}
+        return json.dumps(payload).encode('utf-8')
+
+    @staticmethod
+    def is_timeout(error):
+        """True if an exception raised by post_body was a timeout"""
+        import requests
+        return isinstance(error, requests.Timeout)
+
+    def post_body(self, body):
+        """Sends an already encoded request body and returns the JSON reply (None on HTTP error)"""
+        response = self.session.post(self.base_url, data=body, timeout=self.timeout,
+                                     headers={"Content-Type": "application/json"})
+        return response.json() if response.status_code == 200 else None
+
+    def post(self, command_data):
+        """Sends one command and returns the JSON reply (None on HTTP error)"""
+        return self.post_body(self.encode([command_data]))
+
+    def post_batch(self, commands):
+        """Sends several commands in a single round-trip using Draw/CommandList"""
+        return self.post_body(self.encode(commands))
+
+    def close(self):
+        """Closes every pooled connection"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class LightTransport(PixooTransport):
+    def __init__(self, base_url, timeout=5):
+        """
+        Single keep-alive connection on the standard library's http.client
+
+        Same interface as PixooTransport without importing requests, for
+        short-lived processes (scripts, cron jobs) where import time
+        dominates. The connection is reopened after any error.
+        """
+        url = urlsplit(base_url)
+        self.base_url = base_url
+        self.pool_size = 1
+        self.timeout = timeout
+        self._host = url.hostname
+        self._port = url.port or 80
+        self._path = url.path or "/post"
+        self._connection = None
+
+    @staticmethod
+    def is_timeout(error):
+        return isinstance(error, (socket.timeout, TimeoutError))
+
+    def post_body(self, body):
+        import http.client
+
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+        try:
+            self._connection.request("POST", self._path, body=body, headers={"Content-Type": "application/json"})
+            response = self._connection.getresponse()
+            data = response.read()
+        except Exception:
+            self.close()
+            raise
+        return json.loads(data) if response.status == 200 else None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -28,7 +28,7 @@ pip install -r requirements.txt
 
 # Check if everything is installed correctly
 echo "🔍 Verifying installation..."
-python -c "import requests, PIL; print('✅ All dependencies installed successfully!')" 2>/dev/null
+python -c "import requests, PIL, numpy; print('✅ All dependencies installed successfully!')" 2>/dev/null
 
 if [ $? -eq 0 ]; then
     echo ""